@@ -2,11 +2,15 @@ import requests
 import os
 from dotenv import load_dotenv
 import json
+
+from rate_limiter import QuotaExceeded
+from ti_cache import fetch_json
 """
 This script queries the AbuseIPDB API to check the reputation of a given IP address.
 
 Prompts the user for an IP address and an API key, then sends a GET request to the AbuseIPDB API.
 Displays the JSON response containing information about the IP address, such as abuse reports and reputation.
+Responses are cached on disk (ti_cache.py) for a few hours, so repeat lookups do not use quota.
 
 Requirements:
     - requests
@@ -28,7 +32,7 @@ Outputs:
 
 
 url = 'https://api.abuseipdb.com/api/v2/check'
-ip_addr = input("Enter IP Address: ")
+ip_addr = input("Enter IP Address: ").strip()
 API_KEY = os.getenv('abuseipdb_api_key')
 
 querystring = {
@@ -41,8 +45,25 @@ headers = {
     'Key': f'{API_KEY}'
 }
 
-response = requests.request(method='GET', url=url, headers=headers, params=querystring)
+try:
+    decodedResponse = fetch_json("abuseipdb", ip_addr, url, params=querystring, headers=headers)
+except requests.HTTPError as e:
+    # AbuseIPDB explains errors in a JSON body
+    try:
+        decodedResponse = json.loads(e.response.text)
+    except ValueError:
+        print(f"API request failed with status code {e.response.status_code}")
+        exit(1)
+except QuotaExceeded as e:
+    print(f"Not sent: {e}")
+    exit(1)
+except requests.RequestException as e:
+    print(f"Error fetching data for {ip_addr}: {e}")
+    exit(1)
+
+if decodedResponse is None:
+    print(f"AbuseIPDB has no data for {ip_addr} (HTTP 404).")
+    exit(1)
 
-decodedResponse = json.loads(response.text)
 results = json.dumps(decodedResponse, sort_keys=True, indent=4)
-print(results)
\ No newline at end of file
+print(results)
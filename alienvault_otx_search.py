@@ -2,11 +2,13 @@
 This script queries the AlienVault OTX API to retrieve information about a given IP address.
 It fetches both direct indicator pulses and search pulses related to the IP,
 then prints the pulse count and details for each unique pulse.
+Both responses are cached on disk (ti_cache.py), so repeat lookups do not use quota.
 """
 import os
-import requests
 from dotenv import load_dotenv
 
+from ti_cache import fetch_json
+
 load_dotenv()
 
 OTX_KEY = os.getenv("alienvault_api_key")
@@ -18,9 +20,7 @@ def get_otx(ip):
     try:
         url = f"https://otx.alienvault.com/api/v1/indicators/IPv4/{ip}/general"
         headers = {"X-OTX-API-KEY": OTX_KEY}
-        r = requests.get(url, headers=headers, timeout=10)
-        r.raise_for_status()
-        data = r.json()
+        data = fetch_json("otx", ip, url, headers=headers, cache_params={"section": "general"}) or {}
         for p in data.get("pulse_info", {}).get("pulses", []):
             pulses.append({
                 "name": p.get("name"),
@@ -38,9 +38,7 @@ def get_otx(ip):
         url = "https://otx.alienvault.com/api/v1/search/pulses"
         params = {"q": ip, "limit": 10, "page": 1}
         headers = {"X-OTX-API-KEY": OTX_KEY}
-        r = requests.get(url, headers=headers, params=params, timeout=10)
-        r.raise_for_status()
-        data = r.json()
+        data = fetch_json("otx", ip, url, params=params, headers=headers) or {}
         for p in data.get("results", []):
             pulses.append({
                 "name": p.get("name"),
@@ -0,0 +1,200 @@
+"""
+Asynchronous bulk DNS resolution on top of dnspython's asyncio resolver.
+
+Used by dns_records_lookup.py (bulk mode) and subdomain_enumerator.py to
+resolve large name lists without one blocking query after another.
+
+- Queries run concurrently, capped at QUERY_CONCURRENCY in flight.
+- Answers are cached in-process for their TTL (clamped to MIN_TTL..MAX_TTL).
+- NXDOMAIN / no-data answers are cached for the zone's negative TTL (SOA
+  minimum), or NEGATIVE_TTL when the answer carries no SOA.
+- Identical queries that are already in flight are shared, not repeated.
+- Upstream nameservers are configurable; the system resolver is the default.
+
+Each query returns a dict:
+    {"status": "NOERROR" | "NXDOMAIN" | "NODATA" | "SERVFAIL" | "TIMEOUT",
+     "records": [text, ...], "ttl": seconds}
+
+Usage:
+    from async_dns import AsyncDnsResolver
+
+    resolver = AsyncDnsResolver(nameservers=["1.1.1.1", "8.8.8.8"])
+    result = await resolver.query("example.com", "MX")
+    records = await resolver.resolve_types("example.com", ["A", "AAAA", "MX"])
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import dns.asyncresolver
+import dns.exception
+import dns.rdatatype
+import dns.resolver
+
+RECORD_TYPES = ["A", "AAAA", "MX", "NS", "TXT", "CNAME", "SOA", "CAA"]
+QUERY_CONCURRENCY = 256      # queries in flight at once
+QUERY_TIMEOUT = 2.0          # seconds per nameserver attempt
+QUERY_LIFETIME = 6.0         # seconds per query, across retries/nameservers
+MIN_TTL = 30
+MAX_TTL = 24 * 3600
+NEGATIVE_TTL = 300           # used when a negative answer has no SOA
+ERROR_TTL = 30               # SERVFAIL / timeouts are retried soon after
+MAX_CACHE_ENTRIES = 500_000
+
+
+def _soa_negative_ttl(response) -> int | None:
+    """Negative-caching TTL from the SOA in a response's authority section (RFC 2308)."""
+    if response is None:
+        return None
+    for rrset in getattr(response, "authority", []):
+        if rrset.rdtype == dns.rdatatype.SOA and len(rrset):
+            return min(rrset.ttl, rrset[0].minimum)
+    return None
+
+
+def _negative_ttl(exc) -> int:
+    response = None
+    if isinstance(exc, dns.resolver.NXDOMAIN):
+        responses = exc.responses()
+        response = next(iter(responses.values()), None) if responses else None
+    elif isinstance(exc, dns.resolver.NoAnswer):
+        response = exc.kwargs.get("response")
+    ttl = _soa_negative_ttl(response)
+    return NEGATIVE_TTL if ttl is None else ttl
+
+
+class AsyncDnsResolver:
+    """Concurrent resolver with a TTL-honouring positive/negative cache."""
+
+    def __init__(
+        self,
+        nameservers: list | None = None,
+        timeout: float = QUERY_TIMEOUT,
+        lifetime: float = QUERY_LIFETIME,
+        concurrency: int = QUERY_CONCURRENCY,
+    ) -> None:
+        self.resolver = dns.asyncresolver.Resolver(configure=not nameservers)
+        if nameservers:
+            self.resolver.nameservers = list(nameservers)
+        self.resolver.timeout = timeout
+        self.resolver.lifetime = lifetime
+        self.concurrency = concurrency
+        self._semaphore: asyncio.Semaphore | None = None
+        self.cache: dict[tuple, tuple] = {}
+        self.inflight: dict[tuple, asyncio.Future] = {}
+        self.stats = {"queries": 0, "cache_hits": 0, "shared": 0}
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # created lazily so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    def _cache_get(self, key: tuple) -> dict | None:
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        expires, result = entry
+        if expires < time.monotonic():
+            del self.cache[key]
+            return None
+        return result
+
+    def _cache_put(self, key: tuple, result: dict, ttl: int) -> None:
+        if len(self.cache) >= MAX_CACHE_ENTRIES:
+            # drop the oldest tenth (dicts keep insertion order)
+            for old in list(self.cache)[: MAX_CACHE_ENTRIES // 10]:
+                del self.cache[old]
+        self.cache[key] = (time.monotonic() + ttl, result)
+
+    async def _lookup(self, name: str, rdtype: str) -> tuple[dict, int]:
+        self.stats["queries"] += 1
+        try:
+            async with self.semaphore:
+                answer = await self.resolver.resolve(name, rdtype)
+        except dns.resolver.NXDOMAIN as e:
+            return {"status": "NXDOMAIN", "records": [], "ttl": 0}, _negative_ttl(e)
+        except dns.resolver.NoAnswer as e:
+            return {"status": "NODATA", "records": [], "ttl": 0}, _negative_ttl(e)
+        except dns.resolver.LifetimeTimeout:
+            return {"status": "TIMEOUT", "records": [], "ttl": 0}, ERROR_TTL
+        except (dns.resolver.NoNameservers, dns.exception.DNSException):
+            return {"status": "SERVFAIL", "records": [], "ttl": 0}, ERROR_TTL
+        ttl = answer.rrset.ttl
+        records = [r.to_text() for r in answer]
+        return {"status": "NOERROR", "records": records, "ttl": ttl}, min(max(ttl, MIN_TTL), MAX_TTL)
+
+    async def query(self, name: str, rdtype: str) -> dict:
+        """Resolve one (name, type), using the cache and sharing identical in-flight queries."""
+        key = (name.lower().rstrip("."), rdtype.upper())
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+        pending = self.inflight.get(key)
+        if pending is not None:
+            self.stats["shared"] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            result, ttl = await self._lookup(*key)
+            self._cache_put(key, result, ttl)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # retrieved here so an unawaited future does not log a warning
+            future.exception()
+            raise
+        finally:
+            del self.inflight[key]
+
+    async def resolve_types(self, name: str, rdtypes=RECORD_TYPES) -> dict:
+        """
+        Resolve several record types for one name; returns {type: result}.
+        The first type is asked alone; if the name does not exist the others
+        are reported NXDOMAIN without querying them.
+        """
+        rdtypes = list(rdtypes)
+        first = await self.query(name, rdtypes[0])
+        results = {rdtypes[0]: first}
+        if first["status"] == "NXDOMAIN":
+            for rdtype in rdtypes[1:]:
+                results[rdtype] = {"status": "NXDOMAIN", "records": [], "ttl": 0}
+            return results
+        rest = await asyncio.gather(*(self.query(name, rdtype) for rdtype in rdtypes[1:]))
+        results.update(zip(rdtypes[1:], rest))
+        return results
+
+
+async def map_bounded(func, items, workers: int):
+    """
+    Async generator: await func(item) for each item with at most `workers`
+    running, yielding (item, result) as they finish. `items` is consumed lazily.
+    """
+    iterator = iter(items)
+    pending: set[asyncio.Task] = set()
+    exhausted = False
+    while True:
+        while not exhausted and len(pending) < workers:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                exhausted = True
+                break
+            task = asyncio.ensure_future(func(item))
+            task.item = item
+            pending.add(task)
+        if not pending:
+            return
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            yield task.item, task.result()
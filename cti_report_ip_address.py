@@ -3,13 +3,41 @@ This script generates a comprehensive Cyber Threat Intelligence (CTI) report for
 It gathers data from various sources including ipinfo.io, ProxyCheck, Shodan, VirusTotal,
 AbuseIPDB, GreyNoise, AlienVault OTX, and WHOIS. It then uses the OpenAI API to generate
 an executive summary of the findings and saves the detailed report to a text file.
+
+All sources are queried concurrently. Each source has its own time limit
+(SOURCE_TIMEOUTS) and the whole collection step is capped by OVERALL_DEADLINE;
+sources that have not answered by then are reported as empty.
+
+Lookups go through the shared on-disk cache in ti_cache.py, so an IP that was
+enriched recently (by this script or the single-source lookup scripts) does not
+use API quota again until its provider TTL expires. Requests that do go out are
+paced by rate_limiter.py (per-provider rate, concurrency and daily quota), so a
+batch runs as fast as each provider allows and a source whose quota is used up
+is reported as empty.
+
+Batch mode enriches many IPs and streams one JSON line per IP as it finishes:
+    python cti_report_ip_address.py --batch ips.txt [--output results.jsonl]
+    cat ips.txt | python cti_report_ip_address.py --batch -
+Input may contain IPs and CIDR blocks (one per line, '#' comments allowed); entries
+are deduplicated, and CIDRs are expanded to host addresses up to BATCH_MAX_CIDR_HOSTS.
+Re-running with the same --output skips IPs already written there (failed ones
+are retried), so an interrupted batch can simply be restarted.
+Add --reports to also write the usual text report per IP (and --summary to include
+the OpenAI executive summary in those reports).
 """
 import os
-import requests
+import sys
+import json
+import time
+import argparse
 import ipaddress
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from dotenv import load_dotenv
 
+from rate_limiter import limited, request
+from ti_cache import NoData, fetch_json, get_cache
+
 # Optional libraries
 try:
     import shodan
@@ -40,6 +68,26 @@ OTX_KEY = os.getenv("alienvault_api_key")
 IPINFO_KEY = os.getenv("ipinfo_api_key")
 GREYNOISE_KEY = os.getenv("greynoise_api_key")
 
+REQUEST_TIMEOUT = 10      # seconds per HTTP request
+OVERALL_DEADLINE = 20     # seconds for all sources together; slower ones are dropped
+SOURCE_TIMEOUTS = {       # seconds per source (OTX makes two requests)
+    "geo": 10,
+    "proxy": 10,
+    "shodan": 15,
+    "vt": 10,
+    "abuse": 10,
+    "gn": 10,
+    "otx": 20,
+    "whois": 15,
+}
+
+# Batch mode
+BATCH_WORKERS = 16                 # IPs enriched at the same time
+BATCH_COLLECTOR_WORKERS = 32       # source lookups in flight, shared by all IPs
+BATCH_OUTPUT = "cti_batch_results.jsonl"
+BATCH_MAX_CIDR_HOSTS = 4096        # larger CIDR blocks are skipped
+# per-provider request rates, concurrency and daily quotas: rate_limiter.PROVIDER_LIMITS
+
 # ===================== Utility Functions =====================
 def is_valid_ip(ip: str) -> bool:
     try:
@@ -64,9 +112,9 @@ def format_date(value):
 def get_geolocation(ip):
     try:
         url = f"https://ipinfo.io/{ip}/json?token={IPINFO_KEY}"
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        data = r.json()
+        data = fetch_json("ipinfo", ip, url, timeout=REQUEST_TIMEOUT)
+        if not data:
+            return {}
         return {
             "ip": data.get("ip"),
             "hostname": data.get("hostname"),
@@ -82,32 +130,51 @@ def get_geolocation(ip):
         return {}
 
 def get_proxycheck(ip):
-    if proxycheck:
-        try:
-            client = proxycheck.Blocking(key=PROXYCHECK_KEY)
-            info = client.ip(ip)
-            is_proxy = info.proxy() if info else None
-            risk = info.risk() if info else None
-            lat, lon = info.geological() if info else (None, None)
-            client.close()
-            return {"is_proxy": is_proxy, "risk": risk, "latitude": lat, "longitude": lon}
-        except Exception:
-            pass
-    try:
+    def fetch():
+        if proxycheck:
+            try:
+                client = proxycheck.Blocking(key=PROXYCHECK_KEY)
+                with limited("proxycheck"):
+                    info = client.ip(ip)
+                is_proxy = info.proxy() if info else None
+                risk = info.risk() if info else None
+                lat, lon = info.geological() if info else (None, None)
+                client.close()
+                return {"is_proxy": is_proxy, "risk": risk, "latitude": lat, "longitude": lon}
+            except Exception:
+                pass
         url = f"https://proxycheck.io/v2/{ip}?key={PROXYCHECK_KEY}&vpn=1"
-        r = requests.get(url, timeout=10)
+        r = request("proxycheck", "GET", url, timeout=REQUEST_TIMEOUT)
         r.raise_for_status()
-        data = r.json().get(ip, {})
+        body = r.json()
+        # proxycheck answers errors with HTTP 200 and status "denied"/"error"; raise so
+        # the cache does not store them
+        if body.get("status") not in ("ok", "warning"):
+            raise ValueError(f"proxycheck {body.get('status')}: {body.get('message')}")
+        data = body.get(ip, {})
         return {"is_proxy": data.get("proxy"), "risk": data.get("risk"), "latitude": None, "longitude": None}
+
+    try:
+        return get_cache().lookup("proxycheck", ip, fetch) or {}
     except Exception:
         return {}
 
 def get_shodan_data(ip):
     if shodan is None or not SHODAN_KEY:
         return {}
+    def fetch():
+        try:
+            with limited("shodan"):
+                return shodan.Shodan(SHODAN_KEY).host(ip)
+        except shodan.APIError as e:
+            if "No information available" in str(e):
+                raise NoData()
+            raise
+
     try:
-        api = shodan.Shodan(SHODAN_KEY)
-        host = api.host(ip)
+        host = get_cache().lookup("shodan", ip, fetch)
+        if not host:
+            return {}
         return {
             "ip_str": host.get("ip_str"),
             "org": host.get("org"),
@@ -125,9 +192,10 @@ def get_virustotal(ip):
     try:
         url = f"https://www.virustotal.com/api/v3/ip_addresses/{ip}"
         headers = {"x-apikey": VT_KEY}
-        r = requests.get(url, headers=headers, timeout=10)
-        r.raise_for_status()
-        data = r.json().get("data", {}).get("attributes", {})
+        data = fetch_json("virustotal", ip, url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if not data:
+            return {}
+        data = data.get("data", {}).get("attributes", {})
         votes = data.get("total_votes", {})
         return {
             "asn": data.get("asn"),
@@ -148,9 +216,8 @@ def get_abuseipdb(ip):
         url = "https://api.abuseipdb.com/api/v2/check"
         headers = {"Key": ABUSEIPDB_KEY, "Accept": "application/json"}
         params = {"ipAddress": ip, "maxAgeInDays": "90"}
-        r = requests.get(url, headers=headers, params=params, timeout=10)
-        r.raise_for_status()
-        return r.json().get("data", {})
+        data = fetch_json("abuseipdb", ip, url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+        return (data or {}).get("data", {})
     except Exception:
         return {}
 
@@ -160,9 +227,7 @@ def get_greynoise(ip):
     try:
         url = f"https://api.greynoise.io/v3/community/{ip}"
         headers = {"key": GREYNOISE_KEY}
-        r = requests.get(url, headers=headers, timeout=10)
-        r.raise_for_status()
-        return r.json()
+        return fetch_json("greynoise", ip, url, headers=headers, timeout=REQUEST_TIMEOUT) or {}
     except Exception:
         return {}
 
@@ -175,9 +240,8 @@ def get_otx(ip):
     try:
         url = f"https://otx.alienvault.com/api/v1/indicators/IPv4/{ip}/general"
         headers = {"X-OTX-API-KEY": OTX_KEY}
-        r = requests.get(url, headers=headers, timeout=10)
-        r.raise_for_status()
-        data = r.json()
+        data = fetch_json("otx", ip, url, headers=headers, timeout=REQUEST_TIMEOUT,
+                          cache_params={"section": "general"}) or {}
         for p in data.get("pulse_info", {}).get("pulses", []):
             pulses.append({
                 "name": p.get("name"),
@@ -195,9 +259,7 @@ def get_otx(ip):
         url = "https://otx.alienvault.com/api/v1/search/pulses"
         params = {"q": ip, "limit": 10, "page": 1}
         headers = {"X-OTX-API-KEY": OTX_KEY}
-        r = requests.get(url, headers=headers, params=params, timeout=10)
-        r.raise_for_status()
-        data = r.json()
+        data = fetch_json("otx", ip, url, params=params, headers=headers, timeout=REQUEST_TIMEOUT) or {}
         for p in data.get("results", []):
             pulses.append({
                 "name": p.get("name"),
@@ -217,8 +279,9 @@ def get_otx(ip):
 def get_whois_data(identifier):
     if whois is None:
         return {}
-    try:
-        data = whois.whois(identifier)
+    def fetch():
+        with limited("whois"):
+            data = whois.whois(identifier)
         return {
             "ip": identifier,
             "domain": safe_join(getattr(data, 'domain', 'N/A')),
@@ -230,9 +293,66 @@ def get_whois_data(identifier):
             "status": safe_join(getattr(data, 'status', 'N/A')),
             "emails": safe_join(getattr(data, 'emails', 'N/A')),
         }
+
+    try:
+        return get_cache().lookup("whois", identifier, fetch) or {}
     except Exception:
         return {}
 
+COLLECTORS = {
+    "geo": get_geolocation,
+    "proxy": get_proxycheck,
+    "shodan": get_shodan_data,
+    "vt": get_virustotal,
+    "abuse": get_abuseipdb,
+    "gn": get_greynoise,
+    "otx": get_otx,
+    "whois": get_whois_data,
+}
+
+def gather_cti_data(ip, deadline=OVERALL_DEADLINE, pool=None):
+    """
+    Run every collector concurrently and return {source: data}.
+    A source that fails, or misses its SOURCE_TIMEOUTS entry or the overall
+    deadline, contributes an empty dict so the report can still be written.
+    With deadline=None every source is awaited (batch mode, where rate limits
+    can delay a call well past its usual timeout). `pool` is a shared executor
+    for the collectors (batch mode); without one a pool is made for this IP.
+    """
+    results = {name: {} for name in COLLECTORS}
+    start = time.monotonic()
+    if deadline is None:
+        limits = {name: float("inf") for name in COLLECTORS}
+    else:
+        limits = {
+            name: start + min(SOURCE_TIMEOUTS.get(name, deadline), deadline)
+            for name in COLLECTORS
+        }
+
+    own_pool = pool is None
+    if own_pool:
+        pool = ThreadPoolExecutor(max_workers=len(COLLECTORS))
+    pending = {pool.submit(COLLECTORS[name], ip): name for name in COLLECTORS}
+    while pending:
+        next_limit = min(limits[name] for name in pending.values())
+        timeout = None if next_limit == float("inf") else max(0, next_limit - time.monotonic())
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = pending.pop(future)
+            try:
+                results[name] = future.result() or {}
+            except Exception as e:
+                print(f"[!] {name} failed for {ip}: {e}")
+        now = time.monotonic()
+        for future, name in list(pending.items()):
+            if now >= limits[name]:
+                print(f"[!] {name} did not answer in time for {ip}; continuing without it.")
+                future.cancel()
+                del pending[future]
+    if own_pool:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
 # ===================== LLM Executive Summary =====================
 def generate_executive_summary(report_text: str) -> str:
     if openai is None or not OPENAI_KEY:
@@ -283,26 +403,16 @@ def prepare_cti_text_for_llm(geo, proxy, shodan_data, vt, abuse, gn, otx, whois_
         lines.append(f"{k}: {v}")
     return "\n".join(lines)
 
-# ===================== Main =====================
-def main():
-    ip = input("Enter IP address: ").strip()
-    if not is_valid_ip(ip):
-        print("Invalid IP address.")
-        return
-
-    timestamp = datetime.now().strftime("%d %B %Y")
-    geo = get_geolocation(ip)
-    proxy = get_proxycheck(ip)
-    shodan_data = get_shodan_data(ip)
-    vt = get_virustotal(ip)
-    abuse = get_abuseipdb(ip)
-    gn = get_greynoise(ip)
-    otx = get_otx(ip)
-    whois_data = get_whois_data(ip)
-
-    # LLM Summary
-    cti_text = prepare_cti_text_for_llm(geo, proxy, shodan_data, vt, abuse, gn, otx, whois_data)
-    exec_summary = generate_executive_summary(cti_text)
+# ===================== Report =====================
+def write_report(ip, data, exec_summary, timestamp):
+    geo = data["geo"]
+    proxy = data["proxy"]
+    shodan_data = data["shodan"]
+    vt = data["vt"]
+    abuse = data["abuse"]
+    gn = data["gn"]
+    otx = data["otx"]
+    whois_data = data["whois"]
 
     # Write report
     report_lines = []
@@ -361,10 +471,142 @@ def main():
 
     report_lines.append("============================================================")
 
-    filename = f"{ip}_CTI_Report.txt"
+    filename = f"{ip.replace(':', '_')}_CTI_Report.txt"  # IPv6 colons are invalid on Windows
     with open(filename, "w", encoding="utf-8") as f:
         f.write("\n".join(report_lines))
+    return filename
+
+def summarize(data):
+    cti_text = prepare_cti_text_for_llm(
+        data["geo"], data["proxy"], data["shodan"], data["vt"],
+        data["abuse"], data["gn"], data["otx"], data["whois"],
+    )
+    return generate_executive_summary(cti_text)
+
+# ===================== Batch =====================
+def iter_batch_ips(lines):
+    """Yield unique IPs from lines of IPs / CIDR blocks, expanding small networks."""
+    seen = set()
+    for line in lines:
+        entry = line.split("#", 1)[0].strip()
+        if not entry:
+            continue
+        try:
+            network = ipaddress.ip_network(entry, strict=False)
+        except ValueError:
+            print(f"[!] Skipping invalid entry: {entry}", file=sys.stderr)
+            continue
+        if network.num_addresses == 1:
+            hosts = [network.network_address]
+        elif network.num_addresses > BATCH_MAX_CIDR_HOSTS:
+            print(f"[!] Skipping {network}: more than {BATCH_MAX_CIDR_HOSTS} addresses", file=sys.stderr)
+            continue
+        else:
+            hosts = network.hosts()
+        for host in hosts:
+            ip = str(host)
+            if ip not in seen:
+                seen.add(ip)
+                yield ip
+
+def enrich_for_batch(ip, write_reports, with_summary, collector_pool=None):
+    data = gather_cti_data(ip, deadline=None, pool=collector_pool)
+    record = {"ip": ip, "collected_at": datetime.now().isoformat(timespec="seconds"), **data}
+    if write_reports:
+        exec_summary = summarize(data) if with_summary else "Not requested (batch mode)."
+        record["report_file"] = write_report(ip, data, exec_summary, datetime.now().strftime("%d %B %Y"))
+    return record
+
+def load_done_ips(output_path):
+    """IPs that already have a successful record in `output_path` (for resume)."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by an interrupted run
+            if isinstance(record, dict) and record.get("ip") and "error" not in record:
+                done.add(record["ip"])
+    return done
+
+def run_batch(source, output_path, write_reports=False, with_summary=False):
+    """
+    Enrich every IP from `source` ('-' = stdin) and stream results to JSONL.
+    IPs that already have a record in `output_path` are skipped, so an
+    interrupted run can be restarted; IPs whose record is an error are retried.
+    """
+    fh = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
+    done_ips = load_done_ips(output_path)
+    if done_ips:
+        print(f"[*] Resuming: {len(done_ips)} IPs already in {output_path}")
+    ips = (ip for ip in iter_batch_ips(fh) if ip not in done_ips)
+    done_count = 0
+    started = time.monotonic()
+
+    # one collector pool for the whole batch instead of one per IP
+    with ThreadPoolExecutor(max_workers=BATCH_COLLECTOR_WORKERS) as collector_pool, \
+         ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool, \
+         open(output_path, "a", encoding="utf-8") as out:
+        in_flight = {}
+        exhausted = False
+        while in_flight or not exhausted:
+            # keep the queue bounded instead of submitting every IP up front
+            while not exhausted and len(in_flight) < BATCH_WORKERS * 2:
+                ip = next(ips, None)
+                if ip is None:
+                    exhausted = True
+                    break
+                in_flight[pool.submit(enrich_for_batch, ip, write_reports, with_summary, collector_pool)] = ip
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                ip = in_flight.pop(future)
+                try:
+                    record = future.result()
+                except Exception as e:
+                    record = {"ip": ip, "error": str(e)}
+                out.write(json.dumps(record, default=str) + "\n")
+                out.flush()
+                done_count += 1
+                if done_count % 50 == 0:
+                    rate = done_count / max(time.monotonic() - started, 1e-9)
+                    print(f"[*] {done_count} IPs done ({rate:.1f}/s)")
+
+    if fh is not sys.stdin:
+        fh.close()
+    print(f"Batch complete: {done_count} IPs written to {output_path}")
+    for provider, c in sorted(get_cache().counters.items()):
+        print(f"  cache {provider}: {c['hits']} hits, {c['negative_hits']} cached no-data, {c['misses']} misses")
+
+# ===================== Main =====================
+def main():
+    parser = argparse.ArgumentParser(description="CTI report for one IP, or batch enrichment of many.")
+    parser.add_argument("--batch", metavar="FILE", help="file of IPs/CIDRs, or '-' for stdin")
+    parser.add_argument("--output", default=BATCH_OUTPUT, help="JSONL output for batch mode")
+    parser.add_argument("--reports", action="store_true", help="batch mode: also write a text report per IP")
+    parser.add_argument("--summary", action="store_true", help="batch mode: include the OpenAI summary in reports")
+    args = parser.parse_args()
+
+    if args.batch:
+        run_batch(args.batch, args.output, args.reports, args.summary)
+        return
+
+    ip = input("Enter IP address: ").strip()
+    if not is_valid_ip(ip):
+        print("Invalid IP address.")
+        return
+
+    timestamp = datetime.now().strftime("%d %B %Y")
+    data = gather_cti_data(ip)
+
+    # LLM Summary
+    exec_summary = summarize(data)
 
+    filename = write_report(ip, data, exec_summary, timestamp)
     print(f"CTI report for {ip} saved to {filename}")
 
 if __name__ == "__main__":
@@ -8,10 +8,11 @@ a CTI report in both HTML and text formats.
 from newsapi import NewsApiClient
 from openai import OpenAI
 import datetime
-import time
 import os
 from dotenv import load_dotenv
 
+from rate_limiter import limited
+
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv('openai_api_key')
@@ -36,15 +37,17 @@ def news_retrieval(query: str) -> str:
     collected_text = ""
     for page in range(1, MAX_PAGES + 1):
         try:
-            all_articles = newsapi.get_everything(
-                q=query,
-                from_param=report_30_days_ago_date_api,
-                to=report_todays_date_api,
-                language='en',
-                sort_by='publishedAt',
-                page=page,
-                page_size=MAX_ARTICLES_PER_QUERY
-            )
+            # paced and counted against the daily NewsAPI quota by rate_limiter
+            with limited("newsapi"):
+                all_articles = newsapi.get_everything(
+                    q=query,
+                    from_param=report_30_days_ago_date_api,
+                    to=report_todays_date_api,
+                    language='en',
+                    sort_by='publishedAt',
+                    page=page,
+                    page_size=MAX_ARTICLES_PER_QUERY
+                )
             articles = all_articles.get('articles', [])
             if not articles:
                 break
@@ -52,7 +55,6 @@ def news_retrieval(query: str) -> str:
                 desc = article.get('description') or ""
                 if desc:
                     collected_text += desc + "\n"
-            time.sleep(1)
         except Exception as e:
             print(f"Error retrieving news for query '{query}': {e}")
             break
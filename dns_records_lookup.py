@@ -2,9 +2,32 @@
 This script performs a DNS lookup for a given domain and retrieves A, MX, NS, and TXT records.
 It prompts the user for a domain name, queries the DNS records, and then prints the results
 to the console.
+
+Bulk mode resolves a list of domains (one per line, '#' comments allowed) across many
+record types concurrently with the async engine in async_dns.py, and writes one JSON line
+per domain as it completes:
+    python dns_records_lookup.py --bulk domains.txt [--output dns_records.jsonl]
+        [--types A,AAAA,MX,NS,TXT,CNAME,SOA,CAA] [--nameservers 1.1.1.1,8.8.8.8]
+        [--concurrency 256]
+    cat domains.txt | python dns_records_lookup.py --bulk -
+Answers are cached per (name, type) for their TTL (negative answers for the zone's
+negative TTL), so a domain listed more than once is not asked again while its answers
+are fresh. A domain whose lookup fails outright gets a line with an "error" field
+instead of stopping the run.
 """
 import dns.resolver
 import sys
+import json
+import time
+import asyncio
+import argparse
+from datetime import datetime, timezone
+
+from async_dns import RECORD_TYPES, QUERY_CONCURRENCY, AsyncDnsResolver, map_bounded
+
+BULK_OUTPUT = "dns_records.jsonl"
+BULK_DOMAIN_WORKERS = 512     # domains being resolved at the same time
+PROGRESS_EVERY = 1000
 
 def get_dns_records(domain):
     """
@@ -58,7 +81,76 @@ def display_records(domain, records):
         else:
             print(f"{record_type} Records: No records found.")
 
+def iter_domains(lines):
+    """Yield unique, normalized domain names from text lines."""
+    seen = set()
+    for line in lines:
+        domain = line.split("#", 1)[0].strip().lower().rstrip(".")
+        if domain and domain not in seen:
+            seen.add(domain)
+            yield domain
+
+
+async def resolve_bulk(domains, output_path, rdtypes, nameservers=None, concurrency=QUERY_CONCURRENCY):
+    """Resolve every domain for `rdtypes` and stream JSON lines to `output_path`."""
+    resolver = AsyncDnsResolver(nameservers=nameservers, concurrency=concurrency)
+
+    async def resolve_one(domain):
+        # one bad name must not abort the whole run
+        try:
+            return await resolver.resolve_types(domain, rdtypes)
+        except Exception as e:
+            return e
+
+    started = time.monotonic()
+    count = 0
+    errors = 0
+    with open(output_path, "w", encoding="utf-8") as out:
+        async for domain, results in map_bounded(resolve_one, domains, BULK_DOMAIN_WORKERS):
+            record = {"domain": domain, "resolved_at": datetime.now(timezone.utc).isoformat()}
+            if isinstance(results, Exception):
+                errors += 1
+                record["error"] = f"{type(results).__name__}: {results}"
+            else:
+                record["status"] = {t: r["status"] for t, r in results.items()}
+                record["records"] = {t: r["records"] for t, r in results.items()}
+                record["ttl"] = {t: r["ttl"] for t, r in results.items() if r["status"] == "NOERROR"}
+            out.write(json.dumps(record) + "\n")
+            count += 1
+            if count % PROGRESS_EVERY == 0:
+                rate = count / max(time.monotonic() - started, 1e-9)
+                print(f"[*] {count} domains resolved ({rate:.0f}/s)", file=sys.stderr)
+    stats = resolver.stats
+    print(f"Resolved {count} domains into {output_path} "
+          f"({stats['queries']} queries, {stats['cache_hits']} cache hits, "
+          f"{stats['shared']} shared in flight, {errors} failed).", file=sys.stderr)
+    return count
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Look up DNS records for one domain or a list of domains.")
+    parser.add_argument("--bulk", metavar="FILE", help="file with one domain per line ('-' for stdin)")
+    parser.add_argument("--output", default=BULK_OUTPUT, help=f"JSONL output for --bulk (default: {BULK_OUTPUT})")
+    parser.add_argument("--types", default=",".join(RECORD_TYPES),
+                        help="comma-separated record types for --bulk")
+    parser.add_argument("--nameservers", default="",
+                        help="comma-separated upstream resolvers (default: system resolver)")
+    parser.add_argument("--concurrency", type=int, default=QUERY_CONCURRENCY,
+                        help="DNS queries in flight at once")
+    return parser.parse_args(argv)
+
+
 def main():
+    args = parse_args()
+    if args.bulk:
+        rdtypes = [t.strip().upper() for t in args.types.split(",") if t.strip()]
+        nameservers = [n.strip() for n in args.nameservers.split(",") if n.strip()] or None
+        source = sys.stdin if args.bulk == "-" else open(args.bulk, encoding="utf-8")
+        with source:
+            asyncio.run(resolve_bulk(iter_domains(source), args.output, rdtypes,
+                                     nameservers, args.concurrency))
+        return
+
     domain = input("Enter a domain name: ").strip()
     records = get_dns_records(domain)
     display_records(domain, records)
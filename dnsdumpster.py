@@ -2,48 +2,75 @@
 This script queries the DNSDumpster API for information about a given domain.
 It takes a domain name as input, makes an API request using a pre-configured API key,
 parses the JSON response, and extracts and prints all unique IP addresses found in the data.
+
+The response is parsed as it downloads (json_stream.py, with ijson when installed), and
+each IP is printed as soon as it is found, so memory use does not grow with the size of
+the domain.
 """
-import subprocess
-import json
 import os
+import sys
+import requests
 from dotenv import load_dotenv
 
-load_dotenv()
+from http_client import get_session
+from json_stream import iter_response_object_items
 
-api_key = os.getenv('dnsdumpster_api_key')
-domain = input('Enter target domain here: ')
+load_dotenv()
 
-response = subprocess.check_output(
-    f'curl -s -H "X-API-Key: {api_key}" https://api.dnsdumpster.com/domain/{domain}',
-    shell=True
-)
+API_URL = "https://api.dnsdumpster.com/domain/{domain}"
+REQUEST_TIMEOUT = (10, 120)
 
-data = json.loads(response.decode('utf-8'))
 
 def extract_ips(d):
     """
-    Recursively extracts all IP addresses from a nested dictionary or list structure.
+    Recursively yields all IP addresses from a nested dictionary or list structure.
 
     Args:
         d (dict or list): The input data structure containing IP addresses. It can be a dictionary or a list,
             potentially nested, where dictionaries may contain a key 'ips' with a list of dictionaries
             each having an 'ip' key.
 
-    Returns:
-        list: A list of all IP addresses (as strings) found within the input structure.
+    Yields:
+        str: Each IP address found within the input structure, in document order (duplicates included).
     """
-    ips = []
     if isinstance(d, dict):
-        if 'ips' in d:
-            ips.extend(ip['ip'] for ip in d['ips'] if 'ip' in ip)
+        for ip in d.get('ips') or []:
+            if isinstance(ip, dict) and 'ip' in ip:
+                yield ip['ip']
         for value in d.values():
-            ips.extend(extract_ips(value))
+            yield from extract_ips(value)
     elif isinstance(d, list):
         for item in d:
-            ips.extend(extract_ips(item))
-    return ips
+            yield from extract_ips(item)
+
+
+def iter_domain_ips(domain, api_key):
+    """Stream the DNSDumpster record set for `domain` and yield every IP in it."""
+    url = API_URL.format(domain=domain)
+    with get_session().get(url, headers={"X-API-Key": api_key}, timeout=REQUEST_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        # one record (e.g. an 'a' entry with its 'ips') is decoded at a time
+        for _, record in iter_response_object_items(response):
+            yield from extract_ips(record)
+
+
+def main():
+    api_key = os.getenv('dnsdumpster_api_key')
+    domain = input('Enter target domain here: ').strip()
+
+    seen = set()
+    try:
+        for ip in iter_domain_ips(domain, api_key):
+            if ip not in seen:
+                seen.add(ip)
+                print(ip)
+    except requests.RequestException as e:
+        print(f"[!] Error fetching data: {e}")
+        sys.exit(1)
+    except ValueError:
+        print("[!] Failed to decode JSON response")
+        sys.exit(1)
 
-ips = list(set(extract_ips(data)))
 
-for ip in ips:
-    print(ip)
+if __name__ == "__main__":
+    main()
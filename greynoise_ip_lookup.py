@@ -2,11 +2,15 @@
 This script looks up an IP address in the GreyNoise Community API.
 It prompts the user for an IP address, queries the GreyNoise API with a
 pre-configured API key, and prints the raw JSON response to the console.
+Responses are cached on disk (ti_cache.py), so repeat lookups do not use quota.
 """
 import requests
 import os
 from dotenv import load_dotenv
 
+from rate_limiter import QuotaExceeded
+from ti_cache import fetch_json
+
 load_dotenv()
 
 def greynoise_ip_lookup(ip_addr):
@@ -17,7 +21,7 @@ def greynoise_ip_lookup(ip_addr):
     ip_addr (str): The IP address to look up.
 
   Returns:
-    None. Prints the API response text to the console.
+    dict or None: The API response, or None if GreyNoise has not seen the IP.
 
   Note:
     Requires a valid GreyNoise API key assigned to the variable `api_key`.
@@ -27,11 +31,21 @@ def greynoise_ip_lookup(ip_addr):
   headers = {
   'key': api_key
   }
-  response = requests.request("GET", url, headers=headers)
-  print(response.text)
+  return fetch_json("greynoise", ip_addr, url, headers=headers)
 
 if __name__ == '__main__':
   api_key = os.getenv('greynoise_api_key')
-  ip_addr = input('Enter IP address here: ')
-  results = greynoise_ip_lookup(ip_addr)
-  print(results)
\ No newline at end of file
+  ip_addr = input('Enter IP address here: ').strip()
+  try:
+    results = greynoise_ip_lookup(ip_addr)
+  except requests.HTTPError as e:
+    print(f"API request failed with status code {e.response.status_code}")
+    print(e.response.text)
+    exit(1)
+  except QuotaExceeded as e:
+    print(f"Not sent: {e}")
+    exit(1)
+  except requests.RequestException as e:
+    print(f"Error fetching data for {ip_addr}: {e}")
+    exit(1)
+  print(results if results is not None else f"GreyNoise has no data for {ip_addr}.")
@@ -0,0 +1,99 @@
+"""
+Shared HTTP session for the lookup scripts.
+
+A bare `requests.get` opens a new TCP (and TLS) connection for every call.
+The session returned by `get_session()` keeps connections alive in a pool per
+host, so loops and batch jobs pay the handshake once per host.
+
+The session also:
+- applies DEFAULT_TIMEOUT (connect, read) when a call does not pass `timeout`;
+- retries connection errors and 500/502/504 answers with exponential backoff
+  plus jitter (429 and 503 are left to the caller);
+- advertises brotli ("br") in Accept-Encoding when the `brotli` package is
+  installed, in addition to gzip/deflate, and decodes the answer transparently.
+
+Calls that go through rate_limiter.request use its own session built with
+retries=0: it does the retrying itself, so every attempt is paced and counted
+against the provider's quota.
+
+HTTP/2 is not offered: requests/urllib3 speak HTTP/1.1 only, and every script
+handles requests' exception types, so keep-alive pooling is where the
+handshake savings come from.
+
+Usage:
+    from http_client import get_session
+
+    r = get_session().get(url, params=params)
+"""
+
+from __future__ import annotations
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from urllib3.util.request import ACCEPT_ENCODING
+
+DEFAULT_TIMEOUT = (5, 15)        # seconds: connect, read
+POOL_CONNECTIONS = 32            # hosts kept in the pool cache
+POOL_MAXSIZE = 32                # open connections kept per host
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.5              # 0.5s, 1s, 2s ... between attempts
+RETRY_JITTER = 0.5               # up to this many extra seconds per wait
+RETRY_STATUSES = (500, 502, 504)
+
+
+class PooledSession(requests.Session):
+    """requests.Session with a default timeout."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT) -> None:
+        super().__init__()
+        self.default_timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.default_timeout)
+        return super().request(method, url, **kwargs)
+
+
+def build_retry(total: int = RETRY_TOTAL) -> Retry:
+    options = dict(
+        total=total,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+    try:
+        return Retry(backoff_jitter=RETRY_JITTER, **options)
+    except TypeError:
+        # urllib3 < 2 has no jitter option
+        return Retry(**options)
+
+
+def build_session(timeout=DEFAULT_TIMEOUT, retries: int = RETRY_TOTAL, pool_maxsize: int = POOL_MAXSIZE) -> PooledSession:
+    """New pooled session; use get_session() unless you need different retry or pool settings."""
+    session = PooledSession(timeout)
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize,
+        max_retries=build_retry(retries),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    return session
+
+
+_session: PooledSession | None = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> PooledSession:
+    """Process-wide pooled session; safe to share between worker threads."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
@@ -18,6 +18,8 @@ from bs4 import BeautifulSoup
 import dateparser
 import re
 
+from keyword_matcher import KeywordMatcher
+
 LANG = "en"  # English results only
 WINDOW_DAYS = 30
 
@@ -38,6 +40,9 @@ HACKTIVIST_TERMS = [
 
 PLATFORM_KEYWORDS = ["Twitter", "X", "Facebook", "Instagram", "TikTok", "Telegram", "Reddit", "YouTube"]
 
+HACKTIVIST_MATCHER = KeywordMatcher(HACKTIVIST_TERMS)
+PLATFORM_MATCHER = KeywordMatcher(PLATFORM_KEYWORDS, whole_words=True)
+
 
 def clean_html(raw_html):
     if not raw_html:
@@ -53,17 +58,12 @@ def build_influence_query():
 def detect_platforms(text):
     if not text:
         return ""
-    found = [p for p in PLATFORM_KEYWORDS if re.search(r"\b" + re.escape(p) + r"\b", text, re.IGNORECASE)]
-    return ", ".join(found)
+    hits = PLATFORM_MATCHER.find_all(text)
+    return ", ".join(p for p in PLATFORM_KEYWORDS if p in hits)
 
 
 def contains_hacktivist_terms(text):
-    if not text:
-        return False
-    for term in HACKTIVIST_TERMS:
-        if re.search(re.escape(term), text, re.IGNORECASE):
-            return True
-    return False
+    return HACKTIVIST_MATCHER.search(text)
 
 
 def is_state_sponsored(text):
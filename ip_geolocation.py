@@ -2,11 +2,15 @@
 This script retrieves geolocation information for a given IP address using the ipinfo.io API.
 It prompts the user for an IP address, fetches the data, and then displays details
 such as city, region, country, and ISP.
+Answers are cached on disk (ti_cache.py) for a week.
 """
 import requests
 import os
 from dotenv import load_dotenv
 
+from rate_limiter import QuotaExceeded
+from ti_cache import fetch_json
+
 load_dotenv()
 
 def get_geolocation(ip):
@@ -14,11 +18,8 @@ def get_geolocation(ip):
     url = f'https://ipinfo.io/{ip}/json?token={access_token}'
 
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        return data
-    except requests.RequestException as e:
+        return fetch_json("ipinfo", ip, url)
+    except (requests.RequestException, QuotaExceeded) as e:
         print(f"Error fetching data for IP {ip}: {e}")
         return None
 
@@ -46,6 +47,6 @@ def display_results(data):
         print("No data found.")
 
 if __name__ == "__main__":
-    ip_address = input("Enter an IP address: ")
+    ip_address = input("Enter an IP address: ").strip()
     geolocation_data = get_geolocation(ip_address)
     display_results(geolocation_data)
@@ -8,12 +8,15 @@ Features:
 - Handles API errors and invalid IPs gracefully.
 - Outputs results in a CSV file with columns: 'IP', 'VPN/Proxy'.
 - Includes basic error handling for file operations and network requests.
+- Paces requests with rate_limiter.py (ip-api.com allows 45 per minute) and waits out
+  HTTP 429 answers instead of sleeping a fixed time between IPs.
 Usage:
 Run the script and enter the name of the CSV file containing IP addresses when prompted.
 """
-import time
 import csv
 
+from rate_limiter import request
+
 input_file = input('Enter csv file name here: ')
 output_file = "results.csv"
 
@@ -31,12 +34,11 @@ try:
                 continue
 
             ip = row[0].strip()
-            time.sleep(1.4)
-            
+
             status = f"Failed: Could not connect"
             try:
                 api_url = f"http://ip-api.com/json/{ip}?fields=status,message,proxy,hosting,query"
-                response = requests.get(api_url, timeout=5)
+                response = request("ip-api", "GET", api_url, timeout=5)
                 response.raise_for_status()
                 data = response.json()
 
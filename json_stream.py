@@ -0,0 +1,212 @@
+"""
+Incremental JSON parsing for large API responses.
+
+The functions here yield the pieces of a JSON document one at a time while
+the body is still downloading, so peak memory stays at about one element no
+matter how large the response is.
+
+- `iter_array_items`: elements of a top-level array (crt.sh).
+- `iter_object_array_items`: (key, element) for every element of every
+  top-level array member, and (key, value) for scalar members (DNSDumpster).
+
+`iter_response_array` / `iter_response_object_items` take a streamed requests
+response and use the `ijson` package (C backend, optional) when it is installed,
+falling back to the pure-Python scanner below otherwise.
+
+Usage:
+    from json_stream import iter_response_array
+
+    response = get_session().get(url, stream=True)
+    for entry in iter_response_array(response):
+        ...
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+CHUNK_SIZE = 64 * 1024
+_WHITESPACE = re.compile(r"\s*")
+_decoder = json.JSONDecoder()
+
+
+def iter_response_text(response, chunk_size: int = CHUNK_SIZE):
+    """Yield decoded text chunks from a streamed requests response."""
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+class _Scanner:
+    """Pull-based reader over text chunks that keeps only the unparsed tail in memory."""
+
+    def __init__(self, chunks) -> None:
+        self.chunks = iter(chunks)
+        self.buf = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def more(self) -> bool:
+        if self.exhausted:
+            return False
+        try:
+            chunk = next(self.chunks)
+        except StopIteration:
+            self.exhausted = True
+            return False
+        # drop what has been consumed so the buffer stays about one element long
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected {char!r} in JSON, found {found or 'end of input'!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        if not self.peek():
+            raise ValueError("unexpected end of JSON input")
+        while True:
+            try:
+                item, end = _decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if not self.more():
+                    raise
+                continue
+            # a number or literal may continue in the next chunk
+            if end == len(self.buf) and self.more():
+                continue
+            self.pos = end
+            return item
+
+    def end(self) -> None:
+        """Raise ValueError unless only whitespace is left."""
+        found = self.peek()
+        if found:
+            raise ValueError(f"unexpected {found!r} after the end of the JSON document")
+
+    def items(self, close: str):
+        """Yield values of the container just opened, up to `close` (']' or '}' members)."""
+        if self.peek() == close:
+            self.pos += 1
+            return
+        while True:
+            yield
+            separator = self.peek()
+            self.pos += 1
+            if separator == close:
+                return
+            if separator != ",":
+                raise ValueError(f"expected ',' or {close!r} in JSON, found {separator or 'end of input'!r}")
+
+
+def iter_array_items(chunks):
+    """
+    Yield each element of a top-level JSON array from an iterable of text chunks.
+    Raises ValueError if the text is not a JSON array (trailing data included).
+    """
+    scanner = _Scanner(chunks)
+    scanner.expect("[")
+    for _ in scanner.items("]"):
+        yield scanner.value()
+    scanner.end()
+
+
+def iter_object_array_items(chunks):
+    """
+    Walk a top-level JSON object from text chunks. For a member whose value is
+    an array, yield (key, element) per element; for any other member yield
+    (key, value). Raises ValueError if the text is not a JSON object (trailing
+    data included).
+    """
+    scanner = _Scanner(chunks)
+    scanner.expect("{")
+    for _ in scanner.items("}"):
+        key = scanner.value()
+        scanner.expect(":")
+        if scanner.peek() == "[":
+            scanner.pos += 1
+            for _ in scanner.items("]"):
+                yield key, scanner.value()
+        else:
+            yield key, scanner.value()
+    scanner.end()
+
+
+def _raw_stream(response):
+    # ijson reads bytes itself; have urllib3 undo gzip/deflate/br first
+    response.raw.decode_content = True
+    return response.raw
+
+
+def _ijson_object_array_items(fileobj):
+    builder = None
+    depth = 0
+    key = None
+    for prefix, event, value in ijson.parse(fileobj, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+                if depth == 0:
+                    yield key, builder.value
+                    builder = None
+            continue
+        if not prefix:
+            continue
+        key, _, rest = prefix.partition(".")
+        if rest == "item" or (not rest and event not in ("start_array", "end_array")):
+            if event in ("start_map", "start_array"):
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+                depth = 1
+            elif event not in ("map_key", "end_map", "end_array"):
+                yield key, value
+
+
+def _ijson_errors_as_value_error(items):
+    # callers only need to handle ValueError, whichever parser is in use
+    try:
+        yield from items
+    except ijson.JSONError as e:
+        raise ValueError(str(e)) from e
+
+
+def iter_response_array(response):
+    """Elements of a top-level JSON array in a streamed response. Raises ValueError on bad JSON."""
+    if ijson is not None:
+        return _ijson_errors_as_value_error(ijson.items(_raw_stream(response), "item", use_float=True))
+    return iter_array_items(iter_response_text(response))
+
+
+def iter_response_object_items(response):
+    """`iter_object_array_items` over a streamed response. Raises ValueError on bad JSON."""
+    if ijson is not None:
+        return _ijson_errors_as_value_error(_ijson_object_array_items(_raw_stream(response)))
+    return iter_object_array_items(iter_response_text(response))
@@ -0,0 +1,88 @@
+"""
+Shared multi-keyword matcher used by the Telegram and news keyword filters.
+
+All keywords are compiled into one case-insensitive regular expression, so a
+text is scanned once no matter how many keywords are configured (instead of one
+`in` / `re.search` per keyword).
+
+Options:
+- `whole_words`: only match keywords that are not part of a longer word
+  ("iran" does not match "tirana").
+- `flexible_phrases` (off by default): spaces inside a multi-word keyword match
+  any run of whitespace, so "north korea" also matches "North\\nKorea". Without
+  it a keyword matches as a plain case-insensitive substring.
+
+Usage:
+    from keyword_matcher import KeywordMatcher
+
+    matcher = KeywordMatcher(["china", "north korea"], whole_words=True)
+    matcher.search("News from North Korea")    # True
+    matcher.find_all("China and North Korea")  # {"china", "north korea"}
+
+Overlapping keywords are resolved leftmost-longest, so `find_all` reports
+"north korea" rather than "korea" when both are configured and the phrase occurs.
+"""
+
+from __future__ import annotations
+
+import re
+
+
+def _normalize(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+class KeywordMatcher:
+    """Compiled single-pass matcher for a list of keywords or phrases."""
+
+    def __init__(
+        self,
+        keywords,
+        whole_words: bool = False,
+        flexible_phrases: bool = False,
+    ) -> None:
+        self.whole_words = whole_words
+        self.flexible_phrases = flexible_phrases
+        self.keywords: dict[str, str] = {}
+        for keyword in keywords:
+            key = self._key(keyword or "")
+            if key and key not in self.keywords:
+                self.keywords[key] = keyword.strip()
+
+        self.pattern = self._compile() if self.keywords else None
+
+    def _key(self, value: str) -> str:
+        return _normalize(value) if self.flexible_phrases else value.strip().lower()
+
+    def _compile(self) -> re.Pattern:
+        parts = []
+        # longest first so alternation prefers "north korea" over "north"
+        for key in sorted(self.keywords, key=len, reverse=True):
+            if self.flexible_phrases:
+                part = r"\s+".join(re.escape(word) for word in key.split(" "))
+            else:
+                part = re.escape(key)
+            parts.append(part)
+
+        body = "|".join(parts)
+        if self.whole_words:
+            body = rf"(?<!\w)(?:{body})(?!\w)"
+        return re.compile(body, re.IGNORECASE)
+
+    def __bool__(self) -> bool:
+        return self.pattern is not None
+
+    def search(self, text: str) -> bool:
+        """Return True if any keyword occurs in `text`."""
+        if self.pattern is None or not text:
+            return False
+        return self.pattern.search(text) is not None
+
+    def find_all(self, text: str) -> set[str]:
+        """Return the configured keywords (original spelling) found in `text`."""
+        if self.pattern is None or not text:
+            return set()
+        return {
+            self.keywords.get(self._key(m.group(0)), m.group(0))
+            for m in self.pattern.finditer(text)
+        }
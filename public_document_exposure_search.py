@@ -1,9 +1,10 @@
-import requests
 from bs4 import BeautifulSoup
 import urllib.parse
 import re
 import time
 
+from http_client import get_session
+
 USER_AGENT = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
 }
@@ -29,7 +30,7 @@ def duckduckgo_search(query):
     payload = {"q": query}
 
     try:
-        r = requests.post(url, data=payload, headers=USER_AGENT, timeout=15)
+        r = get_session().post(url, data=payload, headers=USER_AGENT, timeout=15)
         soup = BeautifulSoup(r.text, "html.parser")
         links = []
 
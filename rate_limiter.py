@@ -0,0 +1,264 @@
+"""
+Central rate limiter and quota accountant for the API-backed scripts.
+
+Every provider has its own limits (PROVIDER_LIMITS):
+- `per_minute`: token bucket refill rate; `burst` tokens may be spent at once.
+- `per_day`: daily quota, counted per UTC day and persisted across runs, so
+  a second run on the same day starts from what the first one used.
+- `concurrency`: requests allowed in flight at the same time.
+
+When a provider answers 429 (or 503 with Retry-After), every caller of that
+provider pauses for the Retry-After period (or an exponential backoff with
+jitter when the header is missing) and the request is retried. Connection
+errors and 500/502/504 answers are retried here too, with http_client's
+backoff, rather than inside urllib3: every attempt passes through the limiter,
+so retries are paced and counted against the daily quota like any request.
+
+Batch jobs can therefore run at the fastest pace a provider allows instead of
+a fixed sleep between calls.
+
+Counters are kept in `rate_limits.sqlite3` next to this file unless the
+`rate_limit_state_path` environment variable points elsewhere.
+
+Usage:
+    from rate_limiter import limited, request
+
+    r = request("virustotal", "GET", url, headers=headers, timeout=10)
+
+    with limited("shodan"):          # for client libraries
+        host = api.host(ip)
+"""
+
+from __future__ import annotations
+
+import datetime
+import email.utils
+import os
+import random
+import sqlite3
+import threading
+import time
+
+import requests
+
+from http_client import RETRY_BACKOFF, RETRY_JITTER, RETRY_STATUSES as SERVER_ERROR_STATUSES, build_session
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STATE_PATH = os.getenv("rate_limit_state_path") or os.path.join(SCRIPT_DIR, "rate_limits.sqlite3")
+
+# Free-tier defaults; raise them if you have a paid plan.
+PROVIDER_LIMITS = {
+    "virustotal": {"per_minute": 4, "per_day": 500, "concurrency": 2, "burst": 4},
+    "abuseipdb": {"per_minute": 60, "per_day": 1000, "concurrency": 4},
+    "greynoise": {"per_minute": 30, "per_day": 50, "concurrency": 2},
+    "shodan": {"per_minute": 60, "per_day": None, "concurrency": 1, "burst": 1},
+    "ipinfo": {"per_minute": 600, "per_day": 1600, "concurrency": 8},
+    "proxycheck": {"per_minute": 60, "per_day": 1000, "concurrency": 4},
+    "otx": {"per_minute": 300, "per_day": None, "concurrency": 4},
+    "whois": {"per_minute": 60, "per_day": None, "concurrency": 4},
+    "ip-api": {"per_minute": 45, "per_day": None, "concurrency": 1, "burst": 1},
+    "newsapi": {"per_minute": 60, "per_day": 100, "concurrency": 1, "burst": 1},
+    "viewdns": {"per_minute": 30, "per_day": None, "concurrency": 2},
+}
+DEFAULT_LIMITS = {"per_minute": 60, "per_day": None, "concurrency": 4}
+
+RETRY_STATUSES = (429, 503)
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 120.0
+
+
+class QuotaExceeded(Exception):
+    """Raised when a provider's daily quota has been used up."""
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (when - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+class QuotaLedger:
+    """Daily request counts per provider, stored in SQLite."""
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH) -> None:
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS usage ("
+            "provider TEXT, day TEXT, used INTEGER, PRIMARY KEY (provider, day))"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def today() -> str:
+        return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d")
+
+    def used(self, provider: str) -> int:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT used FROM usage WHERE provider = ? AND day = ?", (provider, self.today())
+            ).fetchone()
+        return row[0] if row else 0
+
+    def take(self, provider: str, per_day: int | None) -> None:
+        """Count one request, or raise QuotaExceeded if the quota is used up."""
+        day = self.today()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT used FROM usage WHERE provider = ? AND day = ?", (provider, day)
+            ).fetchone()
+            used = row[0] if row else 0
+            if per_day is not None and used >= per_day:
+                raise QuotaExceeded(f"{provider}: daily quota of {per_day} requests used up")
+            self.conn.execute(
+                "INSERT INTO usage (provider, day, used) VALUES (?, ?, 1) "
+                "ON CONFLICT(provider, day) DO UPDATE SET used = used + 1",
+                (provider, day),
+            )
+            self.conn.commit()
+
+
+class ProviderLimiter:
+    """Concurrency cap, token bucket, daily quota and shared 429 pause for one provider."""
+
+    def __init__(self, name: str, ledger: QuotaLedger, limits: dict | None = None) -> None:
+        limits = {**DEFAULT_LIMITS, **(limits or PROVIDER_LIMITS.get(name, {}))}
+        self.name = name
+        self.ledger = ledger
+        self.per_day = limits["per_day"]
+        self.rate = limits["per_minute"] / 60.0
+        self.capacity = float(limits.get("burst") or max(1, min(limits["per_minute"], limits["concurrency"])))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.semaphore = threading.Semaphore(max(1, limits["concurrency"]))
+        self.lock = threading.Lock()
+
+    def _take_token(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+    def acquire(self) -> None:
+        self.semaphore.acquire()
+        try:
+            self._take_token()
+            self.ledger.take(self.name, self.per_day)
+        except BaseException:
+            self.semaphore.release()
+            raise
+
+    def release(self) -> None:
+        self.semaphore.release()
+
+    def __enter__(self) -> "ProviderLimiter":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller of this provider for `seconds`."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            # the provider is telling us we went too fast; start again from an empty bucket
+            self.tokens = 0.0
+
+    def remaining_today(self) -> int | None:
+        if self.per_day is None:
+            return None
+        return max(0, self.per_day - self.ledger.used(self.name))
+
+
+_ledger: QuotaLedger | None = None
+_limiters: dict[str, ProviderLimiter] = {}
+_session: requests.Session | None = None
+_registry_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Pooled session without urllib3 retries; request() retries so each attempt is counted."""
+    global _session
+    with _registry_lock:
+        if _session is None:
+            _session = build_session(retries=0)
+        return _session
+
+
+def _server_error_backoff(attempt: int) -> float:
+    return RETRY_BACKOFF * 2 ** attempt + random.uniform(0, RETRY_JITTER)
+
+
+def limited(provider: str) -> ProviderLimiter:
+    """Shared limiter for `provider`; use it as a context manager around each call."""
+    global _ledger
+    with _registry_lock:
+        if _ledger is None:
+            _ledger = QuotaLedger()
+        if provider not in _limiters:
+            _limiters[provider] = ProviderLimiter(provider, _ledger)
+        return _limiters[provider]
+
+
+def request(provider: str, method: str, url: str, max_retries: int = MAX_RETRIES, **kwargs) -> requests.Response:
+    """
+    Send an HTTP request within `provider`'s limits, over the shared pooled session.
+
+    A 429/503 answer pauses the provider for Retry-After seconds (or an
+    exponential backoff) and is retried up to `max_retries` times; the last
+    response, or one asking for a wait longer than BACKOFF_MAX_SECONDS, is
+    returned as-is. Connection errors and 500/502/504 answers are retried
+    after a short backoff without pausing the provider. Every attempt counts
+    against the quota. Raises QuotaExceeded when the daily quota is used up.
+    """
+    limiter = limited(provider)
+    session = get_session()
+    for attempt in range(max_retries + 1):
+        try:
+            with limiter:
+                response = session.request(method, url, **kwargs)
+        except requests.ConnectionError:
+            if attempt == max_retries:
+                raise
+            time.sleep(_server_error_backoff(attempt))
+            continue
+        if attempt == max_retries:
+            return response
+        if response.status_code in SERVER_ERROR_STATUSES:
+            time.sleep(_server_error_backoff(attempt))
+            continue
+        if response.status_code not in RETRY_STATUSES:
+            return response
+        wait = parse_retry_after(response.headers.get("Retry-After"))
+        if wait is None:
+            if response.status_code != 429:
+                return response
+            wait = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)
+            wait += random.uniform(0, wait / 4)
+        elif wait > BACKOFF_MAX_SECONDS:
+            # usually a quota reset hours away; let the caller see the 429
+            return response
+        limiter.pause(wait)
+    return response
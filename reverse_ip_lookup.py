@@ -1,17 +1,30 @@
 """
 This script performs reverse IP lookups and identifies other domains hosted on the same server.
-It takes a single IP address or a file containing a list of IP addresses as input.
+It takes a single entry or a file containing one entry per line. An entry can be:
+- an IP address (192.0.2.10),
+- a CIDR block (192.0.2.0/24; for IPv4 blocks up to /30 the network and broadcast
+  addresses are skipped, as they are not hosts),
+- a range (192.0.2.10-192.0.2.50, or 192.0.2.10-50 for the last octet),
+- an autonomous system (AS13335), expanded to its announced prefixes via RIPEstat.
+Overlapping entries are merged so no address is looked up twice, and blocks are
+expanded lazily, so sweeping a /16 never holds 65k addresses in memory.
+
 For each IP, it performs a reverse DNS lookup and optionally queries the ViewDNS API
-to find other domains. Results are printed to the console and can be exported to a CSV file.
+to find other domains. Lookups run concurrently (RESOLVER_WORKERS at a time) and
+results are printed and written to the CSV file as they arrive.
 """
 import ipaddress
 import socket
 import requests
 import os
 import csv
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
 from dotenv import load_dotenv
 from datetime import datetime, timezone
 
+from http_client import get_session
+from rate_limiter import request
+
 # Load environment variables from .env if present
 load_dotenv()
 
@@ -21,6 +34,9 @@ REQUEST_TIMEOUT = 10  # seconds for API requests
 MAX_RESULTS = 50      # maximum number of domains to return/display per IP
 EXPORT_CSV = True
 EXPORT_CSV_PATH = "reverse_ip_results.csv"
+RESOLVER_WORKERS = 32       # concurrent reverse DNS / ViewDNS lookups
+MAX_ENTRY_ADDRESSES = 65536  # larger blocks (e.g. IPv6 /64s) are skipped
+RIPESTAT_PREFIXES_URL = "https://stat.ripe.net/data/announced-prefixes/data.json"
 
 
 def is_valid_ip(ip: str) -> bool:
@@ -50,7 +66,7 @@ def get_websites_on_server(ip: str, api_key: str | None = None) -> list:
 
     url = f"https://api.viewdns.info/reverseip/?host={ip}&apikey={api_key}&output=json"
     try:
-        resp = requests.get(url, timeout=REQUEST_TIMEOUT)
+        resp = request("viewdns", "GET", url, timeout=REQUEST_TIMEOUT)
         resp.raise_for_status()
     except requests.RequestException as e:
         print(f"  [!] Network/API error while querying ViewDNS for {ip}: {e}")
@@ -105,26 +121,141 @@ def process_single_ip(ip: str, api_key: str | None = None) -> dict:
 
 
 def read_input_entries(user_input: str) -> list:
-    """Return list of IPs from file or a single IP."""
+    """Return list of entries (IPs, CIDRs, ranges, ASNs) from file or a single entry."""
     candidate = user_input.strip().strip('"').strip("'")
     if os.path.isfile(candidate):
         try:
             with open(candidate, "r", encoding="utf-8") as fh:
-                lines = [line.strip() for line in fh if line.strip()]
-                return lines
+                lines = [line.split("#", 1)[0].strip() for line in fh]
+                return [line for line in lines if line]
         except Exception as e:
             print(f"[!] Failed to read file {candidate}: {e}")
             return []
     return [candidate]
 
 
-def export_results_to_csv(results: list, path: str) -> None:
-    """Export results to CSV."""
-    if not results:
-        print("[*] No results to export.")
-        return
+def get_asn_prefixes(asn: str) -> list:
+    """Return the prefixes announced by an AS (e.g. 'AS13335') according to RIPEstat."""
+    try:
+        resp = get_session().get(RIPESTAT_PREFIXES_URL, params={"resource": asn}, timeout=REQUEST_TIMEOUT)
+        resp.raise_for_status()
+        prefixes = resp.json().get("data", {}).get("prefixes", [])
+    except (requests.RequestException, ValueError) as e:
+        print(f"[!] Failed to fetch announced prefixes for {asn}: {e}")
+        return []
+    return [p["prefix"] for p in prefixes if p.get("prefix")]
+
+
+def parse_entry(entry: str) -> list:
+    """
+    Turn one input entry into a list of ip_network objects.
+    Raises ValueError if the entry is not an IP, CIDR, range or ASN.
+    """
+    entry = entry.strip()
+    if entry.upper().startswith("AS") and entry[2:].isdigit():
+        return [ipaddress.ip_network(p, strict=False) for p in get_asn_prefixes(entry.upper())]
+    if "/" in entry:
+        return [ipaddress.ip_network(entry, strict=False)]
+    if "-" in entry:
+        start_text, end_text = (part.strip() for part in entry.split("-", 1))
+        start = ipaddress.ip_address(start_text)
+        if end_text.isdigit() and start.version == 4:
+            # short form: 192.0.2.10-50
+            end = ipaddress.ip_address(start_text.rsplit(".", 1)[0] + "." + end_text)
+        else:
+            end = ipaddress.ip_address(end_text)
+        if start.version != end.version:
+            raise ValueError(f"range {start} - {end} mixes IPv4 and IPv6")
+        if end < start:
+            raise ValueError(f"range end {end} is before start {start}")
+        return list(ipaddress.summarize_address_range(start, end))
+    return [ipaddress.ip_network(ipaddress.ip_address(entry))]
+
+
+def _block_edges(blocks, explicit) -> set:
+    """
+    Network and broadcast addresses of IPv4 CIDR/ASN blocks shorter than /31, which are
+    not hosts. An edge is kept if an IP/range entry names it, or if another block has it
+    as an ordinary host.
+    """
+    edges = set()
+    for net in blocks:
+        if net.version == 4 and net.prefixlen < 31:
+            edges.update((net.network_address, net.broadcast_address))
+    return {
+        ip for ip in edges
+        if not any(ip in net for net in explicit)
+        and all(ip in (net.network_address, net.broadcast_address) for net in blocks if ip in net)
+    }
+
 
+def expand_entries(entries) -> tuple:
+    """
+    Parse entries into a merged, non-overlapping list of networks.
+    Returns (networks, invalid_entries, address_count, skip): `skip` holds the network and
+    broadcast addresses of CIDR/ASN blocks, which iter_targets leaves out (hosts only).
+    Addresses are not expanded here.
+    """
+    by_version = {4: [], 6: []}
+    blocks, explicit = [], []
+    invalid = []
+    for entry in entries:
+        try:
+            networks = parse_entry(entry)
+        except ValueError:
+            invalid.append(entry)
+            continue
+        is_block = "/" in entry or entry.strip().upper().startswith("AS")
+        for net in networks:
+            if net.num_addresses > MAX_ENTRY_ADDRESSES:
+                print(f"[!] Skipping {net} from '{entry}': {net.num_addresses} addresses "
+                      f"(limit {MAX_ENTRY_ADDRESSES}).")
+                continue
+            by_version[net.version].append(net)
+            (blocks if is_block else explicit).append(net)
+
+    networks = []
+    for version in (4, 6):
+        networks.extend(ipaddress.collapse_addresses(by_version[version]))
+    skip = _block_edges(blocks, explicit)
+    return networks, invalid, sum(net.num_addresses for net in networks) - len(skip), skip
+
+
+def iter_targets(networks, invalid, skip=frozenset()):
+    """
+    Yield every address (as a string) lazily, except those in `skip`, then the
+    invalid entries so they get reported.
+    """
+    for net in networks:
+        for ip in net:
+            if ip not in skip:
+                yield str(ip)
+    yield from invalid
+
+
+def lookup_stream(targets, api_key: str | None = None, workers: int = RESOLVER_WORKERS):
+    """
+    Run process_single_ip over `targets` with a bounded thread pool and yield
+    results as they complete. At most a few batches of targets are pulled from
+    the iterator ahead of the results, so large sweeps stay lazy.
+    """
+    max_pending = workers * 4
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for ip in targets:
+            pending.add(pool.submit(process_single_ip, ip, api_key))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in as_completed(pending):
+            yield future.result()
+
+
+def export_results_to_csv(results, path: str) -> int:
+    """Write results to CSV as they arrive from the `results` iterable; return the row count."""
     fieldnames = ["ip", "valid", "reverse_hostname", "other_domains", "error", "timestamp"]
+    count = 0
     try:
         with open(path, "w", encoding="utf-8", newline="") as csvfile:
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
@@ -138,37 +269,29 @@ def export_results_to_csv(results: list, path: str) -> None:
                     "error": r.get("error") or "",
                     "timestamp": r.get("timestamp", "")
                 })
-        print(f"[*] Results exported to CSV: {os.path.abspath(path)}")
-    except Exception as e:
+                count += 1
+                if count % 256 == 0:
+                    csvfile.flush()
+    except OSError as e:
         print(f"[!] Failed to write CSV to {path}: {e}")
+        return count
 
+    if count:
+        print(f"[*] Results exported to CSV: {os.path.abspath(path)}")
+    else:
+        print("[*] No results to export.")
+    return count
 
-def main():
-    print("Reverse IP lookup tool")
-    print("----------------------")
-    print("You can enter a single IP address, or a path to a text file containing one IP per line.")
-    user_input = input("Enter IP or path to file: ").strip()
-    if not user_input:
-        print("No input provided. Exiting.")
-        return
-
-    entries = read_input_entries(user_input)
-    if not entries:
-        print("No valid entries to process. Exiting.")
-        return
-
-    if not API_KEY:
-        print("Note: ViewDNS API key not found. ViewDNS queries will be skipped.")
-        print("Set 'viewdns_api_key' in a .env file or environment to enable ViewDNS.")
 
-    results = []
-    for idx, entry in enumerate(entries, start=1):
-        print(f"\nProcessing {idx}/{len(entries)}: {entry}")
-        res = process_single_ip(entry, API_KEY)
-        results.append(res)
+def print_results(results, total: int):
+    """Print each result as it arrives and pass it on (so it can be exported too)."""
+    for idx, res in enumerate(results, start=1):
+        entry = res["ip"]
+        print(f"\n[{idx}/{total}] {entry}")
 
         if not res["valid"]:
-            print(f"  [-] '{entry}' is not a valid IP address.")
+            print(f"  [-] '{entry}' is not a valid IP address, CIDR, range or ASN.")
+            yield res
             continue
 
         if res["reverse_hostname"]:
@@ -183,9 +306,40 @@ def main():
                     print(f"    - {d}")
             else:
                 print("  [-] No other domains found (or ViewDNS returned none).")
+        yield res
+
+
+def main():
+    print("Reverse IP lookup tool")
+    print("----------------------")
+    print("You can enter a single IP, CIDR, range or ASN, or a path to a text file with one per line.")
+    user_input = input("Enter IP/CIDR/range/ASN or path to file: ").strip()
+    if not user_input:
+        print("No input provided. Exiting.")
+        return
+
+    entries = read_input_entries(user_input)
+    if not entries:
+        print("No valid entries to process. Exiting.")
+        return
+
+    if not API_KEY:
+        print("Note: ViewDNS API key not found. ViewDNS queries will be skipped.")
+        print("Set 'viewdns_api_key' in a .env file or environment to enable ViewDNS.")
+
+    networks, invalid, address_count, skip = expand_entries(entries)
+    total = address_count + len(invalid)
+    if not total:
+        print("No addresses to look up. Exiting.")
+        return
+    print(f"[*] {address_count} addresses in {len(networks)} block(s) to look up.")
 
+    results = print_results(lookup_stream(iter_targets(networks, invalid, skip), API_KEY), total)
     if EXPORT_CSV:
         export_results_to_csv(results, EXPORT_CSV_PATH)
+    else:
+        for _ in results:
+            pass
 
     print("\nDone.")
 
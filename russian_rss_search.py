@@ -13,6 +13,8 @@ import json
 import os
 import csv
 
+from keyword_matcher import KeywordMatcher
+
 # Initialize colorama for color support
 init(autoreset=True)
 
@@ -85,13 +87,11 @@ def parse_date(entry):
 
 
 def search_entries(entries, query):
-    """Return entries that contain the search query."""
-    query = query.lower()
+    """Return entries whose title or summary contains the search query (case-insensitive)."""
+    matcher = KeywordMatcher([query])
     matches = []
     for e in entries:
-        title = e.get("title", "").lower()
-        desc = e.get("summary", "").lower()
-        if query in title or query in desc:
+        if matcher.search(e.get("title", "")) or matcher.search(e.get("summary", "")):
             matches.append(e)
     return matches
 
@@ -1,7 +1,10 @@
-from shodan import Shodan
+from shodan import Shodan, APIError
 import os
 from dotenv import load_dotenv
 
+from rate_limiter import QuotaExceeded, limited
+from ti_cache import NoData, get_cache
+
 load_dotenv()
 
 """
@@ -11,7 +14,8 @@ Steps:
 1. Prompts the user to enter their Shodan API key.
 2. Initializes the Shodan API client with the provided key.
 3. Prompts the user to enter an IP address.
-4. Retrieves and prints information about the specified IP address from Shodan.
+4. Retrieves and prints information about the specified IP address from Shodan
+   (cached on disk by ti_cache.py, so repeat lookups within a day do not use quota).
 
 Requirements:
 - The 'shodan' Python package must be installed.
@@ -24,5 +28,22 @@ Run the script and follow the prompts to enter your API key and the IP address y
 api_key = os.getenv('shodan_api_key')
 
 api = Shodan(api_key)
-ip_addr = input('Enter IP Adrress here: ')
-print(api.host(f'{ip_addr}'))
\ No newline at end of file
+ip_addr = input('Enter IP Adrress here: ').strip()
+
+
+def fetch_host():
+    try:
+        with limited("shodan"):
+            return api.host(f'{ip_addr}')
+    except APIError as e:
+        if "No information available" in str(e):
+            raise NoData()
+        raise
+
+
+try:
+    host = get_cache().lookup("shodan", ip_addr, fetch_host)
+except (APIError, QuotaExceeded) as e:
+    print(f"Error fetching data for {ip_addr}: {e}")
+    exit(1)
+print(host if host is not None else f"No information available for {ip_addr}.")
@@ -1,21 +1,214 @@
 import requests
 """
-Checks the status of each URL in the 'links' list using HTTP GET requests.
-If a URL returns a status code of 200 (OK), it is added to 'new_link_list'.
-Any exceptions during the request are caught and printed with the corresponding URL.
-Finally, prints the list of URLs that are up (status code 200).
+Checks whether each URL in a list is up.
+
+URLs come from a file given on the command line (one per line, '#' lines ignored)
+or, if none is given, from the 'links' list below. Defanged IOCs (hxxp://, example[.]com,
+[:]//) are refanged before checking, and bare hosts get http://.
+
+Each URL is checked with a HEAD request (headers only); if the server rejects HEAD the
+check falls back to a streamed GET that never downloads the body. Redirects are followed
+and the chain is recorded. Checks run concurrently over pooled keep-alive connections
+(http_client.py), with at most PER_HOST_LIMIT requests in flight per host; URLs for a
+busy host wait in that host's queue without holding a worker.
+
+A URL counts as up when its final status (after redirects) is below 400. --only-200
+keeps the original rule of counting only HTTP 200 as up.
+
+Results stream to a CSV or JSONL file (chosen by extension) as they complete:
+    python status_check_up_or_down.py links.txt [--output link_status.jsonl]
+        [--workers 64] [--per-host 4] [--connect-timeout 5] [--read-timeout 10] [--only-200]
+Without a file, the URLs that are up are also printed as a list.
 """
+import csv
+import sys
+import json
+import time
+import argparse
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlsplit
+
+from http_client import build_session
 
 links = []
 
-new_link_list = []
+WORKERS = 64                  # checks in flight overall
+PER_HOST_LIMIT = 4            # checks in flight per host
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 10
+MAX_REDIRECTS = 10
+HEAD_FALLBACK_STATUSES = {400, 403, 405, 501}   # servers that mishandle HEAD
+OUTPUT = "link_status.jsonl"
+CSV_FIELDS = ["input", "url", "up", "status", "method", "final_url", "redirects", "elapsed_ms", "error"]
+
+DEFANG_REPLACEMENTS = [
+    ("hxxps", "https"), ("hxxp", "http"), ("[:]", ":"), ("[://]", "://"),
+    ("[.]", "."), ("(.)", "."), ("{.}", "."), ("[dot]", "."), ("(dot)", "."),
+]
+
 
-for link in links:
+def refang(url):
+    """Undo common IOC defanging and add http:// to bare hosts."""
+    url = url.strip()
+    for old, new in DEFANG_REPLACEMENTS:
+        url = url.replace(old, new).replace(old.upper(), new)
+    if "://" not in url:
+        url = "http://" + url
+    return url
+
+
+def host_key(raw):
+    """Host whose per-host limit a URL counts against ("" if it cannot be parsed)."""
     try:
-        status = requests.get(link).status_code
-        if status == 200:
-            new_link_list.append(link)
-    except requests.exceptions.RequestException as e:
-        print(f"Error occurred with {link}: {e}")
+        return (urlsplit(refang(raw)).hostname or "").lower()
+    except ValueError:
+        # check_url reports the malformed URL
+        return ""
+
+
+def check_url(session, raw, timeout, only_200=False):
+    """Check one URL; returns a result dict (never raises for network errors)."""
+    url = refang(raw)
+    result = {"input": raw, "url": url, "up": False, "status": None, "method": None,
+              "final_url": None, "redirects": [], "elapsed_ms": None, "error": None}
+    started = time.monotonic()
+    try:
+        response = session.head(url, timeout=timeout, allow_redirects=True)
+        result["method"] = "HEAD"
+        if response.status_code in HEAD_FALLBACK_STATUSES:
+            response.close()
+            # stream=True reads only the headers; the body is never downloaded
+            response = session.get(url, timeout=timeout, allow_redirects=True, stream=True)
+            result["method"] = "GET"
+        response.close()
+        result.update(
+            status=response.status_code,
+            up=response.status_code == 200 if only_200 else response.status_code < 400,
+            final_url=response.url,
+            redirects=[f"{r.status_code} {r.url}" for r in response.history],
+        )
+    # ValueError: malformed or half-defanged input (e.g. "example[.com") fails URL parsing
+    except (requests.RequestException, ValueError) as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["elapsed_ms"] = round((time.monotonic() - started) * 1000)
+    return result
+
+
+def check_urls(urls, workers=WORKERS, per_host=PER_HOST_LIMIT, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+               only_200=False):
+    """
+    Yield check results as they complete; `urls` is consumed lazily.
+    A URL is only handed to the pool while its host has fewer than `per_host`
+    checks running; otherwise it waits in that host's queue, so one slow host
+    cannot tie up the workers.
+    """
+    session = build_session(timeout, retries=0, pool_maxsize=per_host)
+    session.max_redirects = MAX_REDIRECTS
+    running = defaultdict(int)    # host -> checks submitted and not finished
+    queued = defaultdict(deque)   # host -> URLs waiting for a free slot
+    waiting = 0
+    pending = {}                  # future -> host
+    urls = iter(urls)
+    exhausted = False
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+
+        def submit(host, url):
+            running[host] += 1
+            pending[pool.submit(check_url, session, url, timeout, only_200)] = host
+
+        while True:
+            while not exhausted and len(pending) + waiting < workers * 4:
+                url = next(urls, None)
+                if url is None:
+                    exhausted = True
+                    break
+                host = host_key(url)
+                if running[host] < per_host:
+                    submit(host, url)
+                else:
+                    queued[host].append(url)
+                    waiting += 1
+            if not pending:
+                # a host only has queued URLs while it has checks running
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                host = pending.pop(future)
+                running[host] -= 1
+                if queued[host]:
+                    submit(host, queued[host].popleft())
+                    waiting -= 1
+                elif not running[host]:
+                    del running[host], queued[host]
+                yield future.result()
+
+
+def iter_links(path):
+    """Yield non-empty lines not starting with '#' from a file ('-' for stdin), skipping duplicates."""
+    seen = set()
+    source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with source:
+        for line in source:
+            url = line.strip()
+            if url and not url.startswith("#") and url not in seen:
+                seen.add(url)
+                yield url
+
+
+def write_results(results, output_path):
+    """Stream results to CSV or JSONL (by extension); returns (checked, up) counts."""
+    checked = up = 0
+    with open(output_path, "w", encoding="utf-8", newline="") as out:
+        as_csv = output_path.lower().endswith(".csv")
+        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS) if as_csv else None
+        if writer:
+            writer.writeheader()
+        for result in results:
+            if writer:
+                writer.writerow({**result, "redirects": " -> ".join(result["redirects"])})
+            else:
+                out.write(json.dumps(result) + "\n")
+            checked += 1
+            up += result["up"]
+            if checked % 1000 == 0:
+                print(f"[*] {checked} checked, {up} up")
+    return checked, up
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check whether URLs are up.")
+    parser.add_argument("file", nargs="?", help="file with one URL per line ('-' for stdin); default: links list")
+    parser.add_argument("--output", default=OUTPUT, help=f"results file, .csv or .jsonl (default: {OUTPUT})")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--per-host", type=int, default=PER_HOST_LIMIT)
+    parser.add_argument("--connect-timeout", type=float, default=CONNECT_TIMEOUT)
+    parser.add_argument("--read-timeout", type=float, default=READ_TIMEOUT)
+    parser.add_argument("--only-200", action="store_true", help="count only HTTP 200 as up (default: status < 400)")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    urls = iter_links(args.file) if args.file else links
+    timeout = (args.connect_timeout, args.read_timeout)
+
+    new_link_list = []
+
+    def collect(results):
+        for result in results:
+            if not args.file:
+                if result["error"]:
+                    print(f"Error occurred with {result['input']}: {result['error']}")
+                elif result["up"]:
+                    new_link_list.append(result["input"])
+            yield result
+
+    checked, up = write_results(collect(check_urls(urls, args.workers, args.per_host, timeout, args.only_200)), args.output)
+    print(f"{checked} URLs checked, {up} up. Results written to {args.output}")
+    if not args.file:
+        print(new_link_list)
+
 
-print(new_link_list)
+if __name__ == "__main__":
+    main()
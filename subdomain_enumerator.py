@@ -1,37 +1,212 @@
+"""
+Enumerates subdomains of a target from crt.sh certificate transparency logs and
+resolves them.
+
+Pipeline (each stage writes JSON lines as results arrive):
+1. names     -> <domain>_names.jsonl     crt.sh is stream-parsed (json_stream.py, with
+                                         ijson when installed); names are normalized
+                                         and deduplicated, '*.' wildcards folded into
+                                         their base name (flagged "wildcard": true).
+2. resolved  -> <domain>_resolved.jsonl  A/AAAA/CNAME looked up concurrently with the
+                                         async engine in async_dns.py. Names that only
+                                         answer because of a wildcard DNS record are
+                                         flagged "wildcard_dns": true.
+3. live      -> <domain>_live.jsonl      optional (--probe): HTTPS, then HTTP, probed
+                                         with a bounded thread pool for names that resolved.
+The sorted name list is still written to <domain>_subdomains.txt.
+
+Usage:
+    python subdomain_enumerator.py [example.com] [--probe] [--nameservers 1.1.1.1,8.8.8.8]
+"""
 import requests
 import json
 import sys
-
-def get_subdomains(domain):
+import uuid
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from async_dns import AsyncDnsResolver
+from http_client import build_session, get_session
+from json_stream import iter_response_array
+
+CRTSH_TIMEOUT = (15, 120)       # crt.sh is slow to start answering for big targets
+RESOLVE_WORKERS = 256           # names being resolved at the same time
+RESOLVE_TYPES = ["A", "AAAA", "CNAME"]
+PROBE_WORKERS = 32              # concurrent HTTP(S) liveness probes
+PROBE_TIMEOUT = (5, 10)
+QUEUE_SIZE = 10000              # names buffered between the crt.sh reader and the resolvers
+
+
+def normalize_name(name, domain):
+    """Return (name, was_wildcard), or (None, False) if it is not under `domain`."""
+    name = name.strip().lower().rstrip(".")
+    wildcard = name.startswith("*.")
+    if wildcard:
+        name = name[2:]
+    if name == domain or name.endswith("." + domain):
+        return name, wildcard
+    return None, False
+
+
+def iter_crtsh_names(domain):
+    """
+    Stream crt.sh results for `domain` and yield (name, was_wildcard) for every
+    new name. Raises requests.RequestException or ValueError on failure.
+    """
     url = f"https://crt.sh/?q=%25.{domain}&output=json"
+    seen = set()
+    with get_session().get(url, timeout=CRTSH_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        for entry in iter_response_array(response):
+            # crt.sh sometimes returns multiple domains separated by newline
+            for raw in entry.get("name_value", "").split("\n"):
+                name, wildcard = normalize_name(raw, domain)
+                if name and name not in seen:
+                    seen.add(name)
+                    yield name, wildcard
+
 
+def get_subdomains(domain):
     try:
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
+        return sorted(name for name, _ in iter_crtsh_names(domain))
     except requests.RequestException as e:
         print(f"[!] Error fetching data: {e}")
         sys.exit(1)
-
-    try:
-        data = response.json()
-    except json.JSONDecodeError:
+    except ValueError:
         print("[!] Failed to decode JSON response")
         sys.exit(1)
 
-    subdomains = set()
 
-    for entry in data:
-        name_value = entry.get("name_value", "")
-        # crt.sh sometimes returns multiple domains separated by newline
-        for sub in name_value.split("\n"):
-            if sub.endswith(domain):
-                subdomains.add(sub.strip())
-
-    return sorted(subdomains)
+def probe_http(session, name):
+    """Try https:// then http://; return a liveness record for `name`."""
+    result = {"name": name, "live": False, "url": None, "status": None,
+              "final_url": None, "server": None, "error": None}
+    for scheme in ("https", "http"):
+        url = f"{scheme}://{name}/"
+        try:
+            # stream=True: only the headers are read, the body is never downloaded
+            with session.get(url, timeout=PROBE_TIMEOUT, allow_redirects=True, stream=True) as r:
+                result.update(live=True, url=url, status=r.status_code,
+                              final_url=r.url, server=r.headers.get("Server"), error=None)
+                return result
+        except requests.RequestException as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+async def detect_wildcard_dns(resolver, domain):
+    """Return the A/AAAA answers a random label under `domain` gets (empty set if none)."""
+    probe = f"{uuid.uuid4().hex[:16]}.{domain}"
+    results = await resolver.resolve_types(probe, ["A", "AAAA"])
+    return {r for result in results.values() for r in result["records"]}
+
+
+async def run_pipeline(domain, probe=False, nameservers=None):
+    """Run the names -> resolved -> live pipeline; returns the sorted list of names."""
+    loop = asyncio.get_running_loop()
+    resolver = AsyncDnsResolver(nameservers=nameservers)
+    queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    names = []
+    counts = {"resolved": 0, "live": 0}
+
+    wildcard_ips = await detect_wildcard_dns(resolver, domain)
+    if wildcard_ips:
+        print(f"[!] {domain} has wildcard DNS ({', '.join(sorted(wildcard_ips))}); "
+              f"matching names will be flagged.")
+
+    names_out = open(f"{domain}_names.jsonl", "w", encoding="utf-8")
+    resolved_out = open(f"{domain}_resolved.jsonl", "w", encoding="utf-8")
+    live_out = open(f"{domain}_live.jsonl", "w", encoding="utf-8") if probe else None
+    probe_pool = ThreadPoolExecutor(max_workers=PROBE_WORKERS) if probe else None
+    probe_session = build_session(PROBE_TIMEOUT, retries=0, pool_maxsize=4) if probe else None
+    probe_slots = asyncio.Semaphore(PROBE_WORKERS * 2)
+    probe_tasks = set()
+    stop_reading = threading.Event()
+
+    def read_crtsh():
+        try:
+            for name, wildcard in iter_crtsh_names(domain):
+                if stop_reading.is_set():
+                    break
+                names.append(name)
+                names_out.write(json.dumps({"name": name, "source": "crt.sh", "wildcard": wildcard}) + "\n")
+                asyncio.run_coroutine_threadsafe(queue.put(name), loop).result()
+        finally:
+            names_out.close()
+            if not stop_reading.is_set():
+                for _ in range(RESOLVE_WORKERS):
+                    asyncio.run_coroutine_threadsafe(queue.put(None), loop).result()
+
+    async def run_probe(name):
+        try:
+            result = await loop.run_in_executor(probe_pool, probe_http, probe_session, name)
+            live_out.write(json.dumps(result) + "\n")
+            if result["live"]:
+                counts["live"] += 1
+                print(f"[live] {result['url']} -> {result['status']}")
+        finally:
+            probe_slots.release()
+
+    async def resolve_worker():
+        while True:
+            name = await queue.get()
+            if name is None:
+                return
+            results = await resolver.resolve_types(name, RESOLVE_TYPES)
+            addresses = results["A"]["records"] + results["AAAA"]["records"]
+            record = {
+                "name": name,
+                "status": "NOERROR" if addresses else results["A"]["status"],
+                "a": results["A"]["records"],
+                "aaaa": results["AAAA"]["records"],
+                "cname": results["CNAME"]["records"],
+                "wildcard_dns": bool(wildcard_ips) and bool(addresses) and set(addresses) <= wildcard_ips,
+            }
+            resolved_out.write(json.dumps(record) + "\n")
+            if addresses:
+                counts["resolved"] += 1
+                if probe and not record["wildcard_dns"]:
+                    await probe_slots.acquire()
+                    task = asyncio.ensure_future(run_probe(name))
+                    probe_tasks.add(task)
+                    task.add_done_callback(probe_tasks.discard)
+
+    reader = loop.run_in_executor(None, read_crtsh)
+    try:
+        await asyncio.gather(*(resolve_worker() for _ in range(RESOLVE_WORKERS)))
+        await reader
+        if probe_tasks:
+            await asyncio.gather(*probe_tasks)
+    finally:
+        stop_reading.set()
+        # unblock the reader thread if it is waiting on a full queue
+        while not queue.empty():
+            queue.get_nowait()
+        resolved_out.close()
+        if live_out:
+            live_out.close()
+        if probe_pool:
+            probe_pool.shutdown(wait=False)
+
+    print(f"\n[+] {len(names)} names, {counts['resolved']} resolved"
+          + (f", {counts['live']} live over HTTP(S)" if probe else "") + ".")
+    return sorted(names)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Enumerate and resolve subdomains from crt.sh.")
+    parser.add_argument("domain", nargs="?", help="target domain (prompted for if omitted)")
+    parser.add_argument("--probe", action="store_true", help="probe resolved names over HTTP(S)")
+    parser.add_argument("--nameservers", default="",
+                        help="comma-separated upstream resolvers (default: system resolver)")
+    return parser.parse_args(argv)
 
 
 def main():
-    domain = input("Enter target domain (example.com): ").strip()
+    args = parse_args()
+    domain = (args.domain or input("Enter target domain (example.com): ")).strip().lower().rstrip(".")
 
     if not domain:
         print("[!] Please enter a valid domain.")
@@ -39,7 +214,15 @@ def main():
 
     print(f"\n[+] Enumerating subdomains for: {domain}\n")
 
-    subdomains = get_subdomains(domain)
+    nameservers = [n.strip() for n in args.nameservers.split(",") if n.strip()] or None
+    try:
+        subdomains = asyncio.run(run_pipeline(domain, probe=args.probe, nameservers=nameservers))
+    except requests.RequestException as e:
+        print(f"[!] Error fetching data: {e}")
+        sys.exit(1)
+    except ValueError:
+        print("[!] Failed to decode JSON response")
+        sys.exit(1)
 
     if subdomains:
         for sub in subdomains:
@@ -54,4 +237,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
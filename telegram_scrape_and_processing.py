@@ -7,7 +7,8 @@ What this tool does
 This script combines two steps into one workflow:
 
 1) Scrape public Telegram channels via rss-bridge (TelegramBridge in Plaintext mode).
-2) Save only new posts into `telegram_posts.csv` (deduplicated by post URL).
+2) Save only new posts into `telegram_posts.csv` (deduplicated by post URL, checked
+   against the persistent index `telegram_seen_urls.sqlite3`).
 3) Filter posts by keyword + recent time window.
 4) Write filtered results to `telegram_posts_filtered.csv`, merging with older filtered output
    and keeping one newest row per URL.
@@ -21,11 +22,21 @@ How data flows
 - Raw archive output:
   - `telegram_posts.csv`
   - Contains all scraped posts over time (no duplicate URLs).
+- SQLite storage (optional, `STORAGE_BACKEND = "sqlite"`):
+  - `telegram_posts.sqlite3` holds the raw posts and the filtered set, indexed on
+    `url`, `channel` and `timestamp`, so window queries read only recent rows.
+  - `telegram_posts_filtered.csv` is still exported for downstream tools.
 - Filtered output:
   - `telegram_posts_filtered.csv`
   - Contains only rows matching your keyword and date-window criteria.
   - If the file already exists, this script merges new matches and rewrites the file
     with deduplication by URL (newest record wins).
+  - Near-duplicate posts (reposts across channels) are kept but clustered: the
+    `duplicate_of` column holds the URL of the first post seen with near-identical
+    `title` + `text`, and is empty for originals.
+  - With `INCREMENTAL_FILTER` on, only raw rows appended since the last run are
+    scanned (tracked in `telegram_filter_state.json`), rows older than
+    `DAYS_WINDOW` are expired, and the file is only rewritten when it changed.
 
 Requirements
 ------------
@@ -37,6 +48,8 @@ Requirements
 Install dependencies:
     pip install requests beautifulsoup4
 
+Keep `keyword_matcher.py` (from this repository) next to this script.
+
 Configuration
 -------------
 Edit these values in this file:
@@ -46,18 +59,64 @@ Edit these values in this file:
 - `KEYWORDS`
   - Case-insensitive keyword list used to match `title` + `text`.
   - If left empty, all posts within the date window pass the filter.
+- `KEYWORD_WHOLE_WORDS`
+  - Match keywords only as whole words ("iran" no longer matches "tirana").
 - `DAYS_WINDOW`
   - Keep only rows newer than N days in the filtering step.
+- `INCREMENTAL_FILTER`
+  - Scan only the new tail of the raw CSV. Changing `KEYWORDS` or `DAYS_WINDOW`
+    triggers one full rescan automatically.
 - `RSS_BRIDGE_BASE`
-  - RSS-Bridge endpoint. If one instance is down, switch bridge index.
+  - Default RSS-Bridge endpoint.
+- `RSS_BRIDGE_POOL`
+  - All RSS-Bridge endpoints to use (public instances and/or a self-hosted bridge).
+    Fetches go to the healthiest endpoint, scored by latency, recent error rate and
+    in-flight requests. An endpoint that fails `BRIDGE_FAILURE_THRESHOLD` times in a
+    row is skipped for `BRIDGE_COOLDOWN_SECONDS`, then gets one probe request; while
+    every endpoint is cooling down, fetches are skipped. A failed channel is retried on
+    another endpoint, up to `BRIDGE_MAX_ATTEMPTS` endpoints per fetch.
+- `FETCH_CONCURRENCY`
+  - Number of channels fetched in parallel. Set to 1 for the old one-by-one behavior.
+- `HOST_RATE_PER_SEC` / `HOST_BURST`
+  - Per-host token bucket used instead of a fixed sleep between requests.
+- `STORAGE_BACKEND`
+  - "csv" (default) or "sqlite". Before switching an existing archive to
+    "sqlite", import it once with `--migrate-csv`.
+- `NEAR_DUP_ENABLED` / `NEAR_DUP_SIMILARITY`
+  - Cluster near-identical posts via MinHash over word pairs of `title` + `text`.
+    Similarity is the estimated Jaccard similarity of those word pairs (0..1).
+    Signatures persist in `telegram_near_dups.sqlite3`, so reposts are recognised
+    across runs; lookups use LSH band buckets rather than a scan of all signatures.
+    Signatures older than `DAYS_WINDOW` are deleted; a cluster whose first post
+    aged out is re-pointed to its oldest remaining post.
+- `USE_HTTP_CACHE`
+  - Send conditional requests (ETag / Last-Modified) and skip parsing channels whose
+    payload is unchanged since the last run. State lives in `telegram_http_cache.json`.
+- `DAEMON_WORKERS`, `POLL_MIN_SECONDS`, `POLL_MAX_SECONDS`, `POLL_BACKOFF`, `POLL_JITTER`
+  - Daemon mode: worker pool size and the bounds/backoff of each channel's poll interval.
+    Busy channels are polled about once per expected new post; channels with no new
+    posts back off exponentially up to `POLL_MAX_SECONDS`.
+- `HTML_CLEANER`
+  - "fast" (regex tag stripper, default) or "bs4" (BeautifulSoup) for post content.
 
 How to run
 ----------
 From this script's folder:
     python telegram_scrape_and_processing.py
 
+Run continuously, polling each channel at a rate learned from its posting history:
+    python telegram_scrape_and_processing.py --daemon
+
+Import existing CSV archives into the SQLite store (one time):
+    python telegram_scrape_and_processing.py --migrate-csv
+
+Compare the payload parser against the previous regex/BeautifulSoup parser on a
+saved RSS-Bridge response:
+    python telegram_scrape_and_processing.py --benchmark-parser payload.txt
+
 What happens on each run:
 - Creates `telegram_posts.csv` if missing.
+- Opens the seen-URL index; on first use it is built once from the raw CSV.
 - Scrapes all channels and appends only unseen post URLs.
 - Filters rows from raw CSV using your keyword + date settings.
 - Creates/updates `telegram_posts_filtered.csv`.
@@ -66,25 +125,41 @@ What happens on each run:
 Notes and limitations
 ---------------------
 - This script only works for public channels accessible through RSS-Bridge.
-- RSS-Bridge availability can vary; network failures are logged and skipped.
+- RSS-Bridge availability can vary; a channel is skipped only after every
+  endpoint tried for it failed.
 - URL is used as the unique key for deduplication.
+- Delete `telegram_seen_urls.sqlite3` to force a rebuild from `telegram_posts.csv`.
 - Timestamp in raw CSV is Unix epoch (UTC); timestamp_human is UTC text.
-- A small delay between channel requests is included to be polite to the bridge.
+- Requests to each bridge host are paced by a token bucket to be polite to the bridge.
+- Channels are fetched concurrently, but posts are deduplicated and appended in
+  `CHANNELS` order, so the raw CSV looks the same as a sequential run.
 """
 
 from __future__ import annotations
 
+import argparse
 import csv
+import hashlib
+import heapq
+import html
+import json
 import logging
 import os
+import random
 import re
+import sqlite3
 import sys
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
 
 import requests
 from bs4 import BeautifulSoup
 
+from keyword_matcher import KeywordMatcher
+
 # ─── SCRAPER CONFIG ───────────────────────────────────────────────────────────
 
 # this is a curated list of channels that are tailored towards geopolitics and military event tracking
@@ -147,8 +222,43 @@ CHANNELS = [
 ]
 
 RSS_BRIDGE_BASE = "https://rss-bridge.org/bridge01/"
+
+# endpoints fetched from; add e.g. "http://localhost:3000/" for a self-hosted bridge
+RSS_BRIDGE_POOL = [
+    RSS_BRIDGE_BASE,
+]
+BRIDGE_MAX_ATTEMPTS = 3          # endpoints tried per channel before giving up
+BRIDGE_FAILURE_THRESHOLD = 3     # consecutive failures that open an endpoint's circuit
+BRIDGE_COOLDOWN_SECONDS = 300    # how long an open circuit keeps an endpoint out
 REQUEST_TIMEOUT = 30
 
+# channels fetched in parallel; 1 reproduces the old sequential sweep
+FETCH_CONCURRENCY = 8
+
+# per-host token bucket: sustained requests/second and burst size
+HOST_RATE_PER_SEC = 1.0
+HOST_BURST = 4
+
+# conditional GET + content hash per channel; unchanged payloads are not parsed
+USE_HTTP_CACHE = True
+
+# daemon mode (--daemon): adaptive per-channel polling
+DAEMON_WORKERS = 4
+POLL_MIN_SECONDS = 60
+POLL_MAX_SECONDS = 6 * 3600
+POLL_BACKOFF = 2.0           # interval multiplier after an empty poll or a failure
+POLL_JITTER = 0.15           # +/- fraction applied to every scheduled interval
+POLL_TARGET_POSTS = 1.0      # aim to poll once per this many expected new posts
+RATE_LOOKBACK_DAYS = 7       # archive history used for the initial posting rates
+RATE_TAIL_BYTES = 8 * 1024 * 1024  # raw CSV read for those rates (the newest rows)
+FILTER_EVERY_SECONDS = 300   # how often the daemon refreshes the filtered output
+
+# "fast" strips tags with a regex; "bs4" uses BeautifulSoup like older versions
+HTML_CLEANER = "fast"
+
+# "csv" keeps the flat CSV archive; "sqlite" stores posts in an indexed database
+STORAGE_BACKEND = "csv"
+
 # ─── PROCESSING CONFIG ────────────────────────────────────────────────────────
 
 # this is a list of keywords that are used to filter the posts
@@ -163,14 +273,30 @@ KEYWORDS = [
     "north korea",
 ]
 
+# match keywords only as whole words instead of anywhere in the text
+KEYWORD_WHOLE_WORDS = False
+
 DAYS_WINDOW = 30
 
+# only scan raw rows appended since the last run and expire old filtered rows
+INCREMENTAL_FILTER = True
+
+# cluster near-duplicate posts in the filtered output (see `duplicate_of`)
+NEAR_DUP_ENABLED = True
+NEAR_DUP_SIMILARITY = 0.8    # estimated Jaccard similarity to count as a duplicate
+NEAR_DUP_MIN_TOKENS = 8      # shorter posts are too generic to compare
+
 # ─── PATHS / CSV SCHEMAS ──────────────────────────────────────────────────────
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 RAW_CSV_FILE = os.path.join(SCRIPT_DIR, "telegram_posts.csv")
 FILTERED_CSV_FILE = os.path.join(SCRIPT_DIR, "telegram_posts_filtered.csv")
+SEEN_INDEX_FILE = os.path.join(SCRIPT_DIR, "telegram_seen_urls.sqlite3")
+FILTER_STATE_FILE = os.path.join(SCRIPT_DIR, "telegram_filter_state.json")
+POSTS_DB_FILE = os.path.join(SCRIPT_DIR, "telegram_posts.sqlite3")
+HTTP_CACHE_FILE = os.path.join(SCRIPT_DIR, "telegram_http_cache.json")
+NEAR_DUP_INDEX_FILE = os.path.join(SCRIPT_DIR, "telegram_near_dups.sqlite3")
 
 RAW_CSV_HEADERS = [
     "channel",
@@ -181,7 +307,7 @@ RAW_CSV_HEADERS = [
     "timestamp_human",
     "text",
 ]
-FILTERED_CSV_HEADERS = ["channel", "url", "title", "timestamp_human", "text"]
+FILTERED_CSV_HEADERS = ["channel", "url", "title", "timestamp_human", "text", "duplicate_of"]
 
 # ─── LOGGING ──────────────────────────────────────────────────────────────────
 
@@ -193,6 +319,46 @@ logging.basicConfig(
 log = logging.getLogger(__name__)
 
 
+# ─── RATE LIMITING ────────────────────────────────────────────────────────────
+
+class TokenBucket:
+    """Thread-safe token bucket; `acquire` blocks until one token is available."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_host_buckets: dict[str, TokenBucket] = {}
+_host_buckets_lock = threading.Lock()
+
+
+def wait_for_host(url: str) -> None:
+    """Block until the per-host token bucket for `url` allows another request."""
+    host = urlparse(url).netloc
+    with _host_buckets_lock:
+        bucket = _host_buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(HOST_RATE_PER_SEC, HOST_BURST)
+            _host_buckets[host] = bucket
+    bucket.acquire()
+
+
 # ─── SCRAPER HELPERS ──────────────────────────────────────────────────────────
 
 def ensure_raw_csv_exists() -> None:
@@ -206,60 +372,657 @@ def ensure_raw_csv_exists() -> None:
     log.info("Created raw CSV: %s", RAW_CSV_FILE)
 
 
-def load_seen_urls() -> set[str]:
-    """Load all URLs in raw CSV for deduplication while appending new posts."""
-    seen: set[str] = set()
-    if not os.path.exists(RAW_CSV_FILE):
-        return seen
-    with open(RAW_CSV_FILE, "r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            seen.add((row.get("url") or "").strip())
-    seen.discard("")
-    return seen
+class SeenUrlIndex:
+    """
+    Persistent set of raw-archive URLs backed by SQLite.
+
+    Membership is a primary-key lookup, so startup and checks do not grow with
+    the archive. URLs added during a run are held in memory until
+    `append_raw_posts` has written them to the CSV, then persisted.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_urls (url TEXT PRIMARY KEY) WITHOUT ROWID"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self.conn.commit()
+        self.pending: set[str] = set()
+
+    def __contains__(self, url: str) -> bool:
+        if url in self.pending:
+            return True
+        cur = self.conn.execute("SELECT 1 FROM seen_urls WHERE url = ?", (url,))
+        return cur.fetchone() is not None
+
+    def add(self, url: str) -> None:
+        self.pending.add(url)
+
+    def add_many(self, urls) -> None:
+        """Persist URLs to the index and drop them from the pending set."""
+        urls = [u for u in urls if u]
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO seen_urls (url) VALUES (?)", ((u,) for u in urls)
+        )
+        self.conn.commit()
+        self.pending.difference_update(urls)
+
+    def is_bootstrapped(self) -> bool:
+        cur = self.conn.execute("SELECT value FROM meta WHERE key = 'bootstrapped'")
+        return cur.fetchone() is not None
+
+    def bootstrap_from_csv(self, path: str, batch_size: int = 10000) -> int:
+        """One-time import of every URL in an existing raw CSV."""
+        count = 0
+        batch: list[str] = []
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                for row in csv.DictReader(f):
+                    url = (row.get("url") or "").strip()
+                    if not url:
+                        continue
+                    batch.append(url)
+                    if len(batch) >= batch_size:
+                        self.add_many(batch)
+                        count += len(batch)
+                        batch = []
+        if batch:
+            self.add_many(batch)
+            count += len(batch)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('bootstrapped', ?)",
+            (str(int(time.time())),),
+        )
+        self.conn.commit()
+        return count
+
+    def close(self) -> None:
+        self.conn.close()
 
 
-def append_raw_posts(posts: list[dict]) -> None:
-    """Append rows to raw CSV (file must already include headers)."""
+def load_seen_urls() -> SeenUrlIndex:
+    """Open the persistent seen-URL index, building it from raw CSV on first use."""
+    index = SeenUrlIndex(SEEN_INDEX_FILE)
+    if not index.is_bootstrapped():
+        log.info("Building seen-URL index from %s (one-time).", RAW_CSV_FILE)
+        count = index.bootstrap_from_csv(RAW_CSV_FILE)
+        log.info("Indexed %s existing URLs.", count)
+    return index
+
+
+def append_raw_posts(posts: list[dict], seen_index: SeenUrlIndex | None = None) -> None:
+    """Append rows to raw CSV (file must already include headers) and index their URLs."""
     with open(RAW_CSV_FILE, "a", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=RAW_CSV_HEADERS)
         writer.writerows(posts)
+    if seen_index is not None:
+        seen_index.add_many((post.get("url") or "").strip() for post in posts)
+
+
+# ─── SQLITE STORAGE ───────────────────────────────────────────────────────────
 
+class SqlitePostStore:
+    """
+    Raw and filtered posts in one SQLite file.
+
+    `posts` mirrors `RAW_CSV_HEADERS` with `url` as primary key and indexes on
+    `channel` and `timestamp`; `filtered_posts` holds the current filtered set.
+    It also implements the seen-URL interface (`in`, `add`) used by the scraper.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS posts (
+                url TEXT PRIMARY KEY,
+                channel TEXT,
+                post_id TEXT,
+                title TEXT,
+                timestamp INTEGER,
+                timestamp_human TEXT,
+                text TEXT
+            );
+            CREATE INDEX IF NOT EXISTS posts_channel ON posts (channel);
+            CREATE INDEX IF NOT EXISTS posts_timestamp ON posts (timestamp);
+
+            CREATE TABLE IF NOT EXISTS filtered_posts (
+                url TEXT PRIMARY KEY,
+                channel TEXT,
+                title TEXT,
+                timestamp INTEGER,
+                timestamp_human TEXT,
+                text TEXT,
+                duplicate_of TEXT
+            );
+            CREATE INDEX IF NOT EXISTS filtered_posts_timestamp ON filtered_posts (timestamp);
+
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            """
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(filtered_posts)")}
+        if "duplicate_of" not in columns:
+            self.conn.execute("ALTER TABLE filtered_posts ADD COLUMN duplicate_of TEXT")
+        self.conn.commit()
+        self.pending: set[str] = set()
+
+    # seen-URL interface
+
+    def __contains__(self, url: str) -> bool:
+        if url in self.pending:
+            return True
+        cur = self.conn.execute("SELECT 1 FROM posts WHERE url = ?", (url,))
+        return cur.fetchone() is not None
+
+    def add(self, url: str) -> None:
+        self.pending.add(url)
+
+    # raw posts
+
+    def insert_posts(self, posts) -> int:
+        """Insert raw post dicts (ignoring known URLs); returns rows inserted."""
+        before = self.conn.total_changes
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO posts "
+            "(url, channel, post_id, title, timestamp, timestamp_human, text) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    (post.get("url") or "").strip(),
+                    post.get("channel", ""),
+                    post.get("post_id", ""),
+                    post.get("title", ""),
+                    int(post["timestamp"]) if str(post.get("timestamp", "")).strip().isdigit() else None,
+                    post.get("timestamp_human", ""),
+                    post.get("text", ""),
+                )
+                for post in posts
+                if (post.get("url") or "").strip()
+            ),
+        )
+        self.conn.commit()
+        self.pending.clear()
+        return self.conn.total_changes - before
+
+    def max_rowid(self) -> int:
+        return self.conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM posts").fetchone()[0]
+
+    def iter_posts_since(self, cutoff: int, after_rowid: int = 0, upto_rowid: int | None = None):
+        """Yield raw rows (CSV-shaped string dicts) with timestamp >= cutoff, by rowid range."""
+        if upto_rowid is None:
+            upto_rowid = self.max_rowid()
+        cur = self.conn.execute(
+            "SELECT channel, post_id, url, title, timestamp, timestamp_human, text "
+            "FROM posts WHERE timestamp >= ? AND rowid > ? AND rowid <= ?",
+            (cutoff, after_rowid, upto_rowid),
+        )
+        for values in cur:
+            yield {
+                header: "" if value is None else str(value)
+                for header, value in zip(RAW_CSV_HEADERS, values)
+            }
+
+    # filtered posts
+
+    def filtered_urls(self, urls) -> set[str]:
+        found: set[str] = set()
+        for url in urls:
+            if self.conn.execute("SELECT 1 FROM filtered_posts WHERE url = ?", (url,)).fetchone():
+                found.add(url)
+        return found
+
+    def upsert_filtered(self, rows: list[tuple[int, dict]]) -> None:
+        """Insert filtered rows; an existing URL is replaced only by a newer row."""
+        self.conn.executemany(
+            "INSERT INTO filtered_posts "
+            "(url, channel, title, timestamp, timestamp_human, text, duplicate_of) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET channel = excluded.channel, "
+            "title = excluded.title, timestamp = excluded.timestamp, "
+            "timestamp_human = excluded.timestamp_human, text = excluded.text, "
+            "duplicate_of = excluded.duplicate_of "
+            "WHERE excluded.timestamp >= filtered_posts.timestamp",
+            (
+                (
+                    (row.get("url") or "").strip(),
+                    row.get("channel", ""),
+                    row.get("title", ""),
+                    ts,
+                    row.get("timestamp_human", ""),
+                    row.get("text", ""),
+                    row.get("duplicate_of", ""),
+                )
+                for ts, row in rows
+                if (row.get("url") or "").strip()
+            ),
+        )
+        self.conn.commit()
+
+    def expire_filtered(self, cutoff: int) -> int:
+        cur = self.conn.execute("DELETE FROM filtered_posts WHERE timestamp < ?", (cutoff,))
+        self.conn.commit()
+        return cur.rowcount
+
+    def filtered_rows(self) -> list[dict]:
+        cur = self.conn.execute(
+            "SELECT channel, url, title, timestamp_human, text, COALESCE(duplicate_of, '') "
+            "FROM filtered_posts ORDER BY timestamp DESC"
+        )
+        return [dict(zip(FILTERED_CSV_HEADERS, values)) for values in cur]
+
+    # bookkeeping
+
+    def get_meta(self, key: str) -> str | None:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def migrate_csv_to_sqlite(batch_size: int = 10000) -> int:
+    """One-time import of `telegram_posts.csv` and the filtered CSV into the SQLite store."""
+    store = SqlitePostStore(POSTS_DB_FILE)
+    raw_count = 0
+    if os.path.isfile(RAW_CSV_FILE):
+        with open(RAW_CSV_FILE, "r", encoding="utf-8", newline="") as f:
+            batch: list[dict] = []
+            for row in csv.DictReader(f):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    raw_count += store.insert_posts(batch)
+                    batch = []
+            raw_count += store.insert_posts(batch)
+
+    existing_rows, _ = load_existing_filtered_rows()
+    store.upsert_filtered(existing_rows)
+    store.set_meta("migrated_from_csv", str(int(time.time())))
+    store.close()
+
+    print(
+        f"Migrated {raw_count} raw post(s) and {len(existing_rows)} filtered row(s) "
+        f"into {POSTS_DB_FILE}."
+    )
+    return 0
+
+
+def open_post_store() -> SeenUrlIndex | SqlitePostStore:
+    """Open the seen-URL set for the configured storage backend."""
+    if STORAGE_BACKEND == "sqlite":
+        store = SqlitePostStore(POSTS_DB_FILE)
+        if os.path.isfile(RAW_CSV_FILE) and store.get_meta("migrated_from_csv") is None:
+            log.warning(
+                "%s exists but was never imported; run with --migrate-csv to keep it.",
+                RAW_CSV_FILE,
+            )
+        return store
+    return load_seen_urls()
+
+
+def store_new_posts(posts: list[dict], store: SeenUrlIndex | SqlitePostStore) -> None:
+    if isinstance(store, SqlitePostStore):
+        store.insert_posts(posts)
+    else:
+        append_raw_posts(posts, store)
+
+
+# ─── BRIDGE POOL ──────────────────────────────────────────────────────────────
+
+class BridgeEndpoint:
+    """Health state of one RSS-Bridge instance."""
+
+    def __init__(self, base: str) -> None:
+        self.base = base
+        self.latency = 1.0          # EWMA of successful response time, seconds
+        self.error_rate = 0.0       # EWMA of failures (0..1)
+        self.consecutive_failures = 0
+        self.open_until = 0.0       # circuit open (endpoint skipped) until this time
+        self.in_flight = 0
+
+    def score(self) -> float:
+        """Lower is better."""
+        return self.latency * (1 + 4 * self.error_rate) * (1 + self.in_flight)
+
+
+class BridgePool:
+    """Chooses the healthiest RSS-Bridge endpoint and tracks per-endpoint health."""
+
+    def __init__(self, bases: list[str]) -> None:
+        self.endpoints = [BridgeEndpoint(base) for base in dict.fromkeys(bases)]
+        self.lock = threading.Lock()
+
+    def acquire(self, exclude: set[str]) -> BridgeEndpoint | None:
+        """
+        Pick the lowest-score endpoint not in `exclude` whose circuit is closed.
+        An endpoint whose cooldown has passed is half-open and gets one probe
+        request at a time. Returns None when nothing is available.
+        """
+        with self.lock:
+            now = time.monotonic()
+            available = [
+                ep
+                for ep in self.endpoints
+                if ep.base not in exclude
+                and ep.open_until <= now
+                and not (ep.consecutive_failures >= BRIDGE_FAILURE_THRESHOLD and ep.in_flight)
+            ]
+            if not available:
+                return None
+            endpoint = min(available, key=lambda ep: (ep.score(), random.random()))
+            endpoint.in_flight += 1
+            return endpoint
+
+    def release(self, endpoint: BridgeEndpoint, ok: bool | None, elapsed: float) -> None:
+        """Record a request's outcome; ok=None (e.g. an HTTP 4xx) leaves the health stats alone."""
+        with self.lock:
+            endpoint.in_flight -= 1
+            if ok is None:
+                return
+            if ok:
+                endpoint.latency = 0.7 * endpoint.latency + 0.3 * elapsed
+                endpoint.error_rate *= 0.7
+                endpoint.consecutive_failures = 0
+                endpoint.open_until = 0.0
+                return
+            endpoint.error_rate = 0.7 * endpoint.error_rate + 0.3
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= BRIDGE_FAILURE_THRESHOLD:
+                endpoint.open_until = time.monotonic() + BRIDGE_COOLDOWN_SECONDS
+                log.warning(
+                    "Bridge %s failed %s times in a row; skipping it for %ss.",
+                    endpoint.base,
+                    endpoint.consecutive_failures,
+                    BRIDGE_COOLDOWN_SECONDS,
+                )
+
+    def log_health(self) -> None:
+        now = time.monotonic()
+        with self.lock:
+            for ep in self.endpoints:
+                state = "open" if ep.open_until > now else "closed"
+                log.info(
+                    "Bridge %s: latency %.2fs, error rate %.0f%%, circuit %s",
+                    ep.base,
+                    ep.latency,
+                    ep.error_rate * 100,
+                    state,
+                )
+
+
+_bridge_pool: BridgePool | None = None
+_bridge_pool_lock = threading.Lock()
+
+
+def get_bridge_pool() -> BridgePool:
+    global _bridge_pool
+    with _bridge_pool_lock:
+        if _bridge_pool is None:
+            _bridge_pool = BridgePool(RSS_BRIDGE_POOL or [RSS_BRIDGE_BASE])
+        return _bridge_pool
+
+
+def is_retryable_fetch_error(exc: requests.RequestException) -> bool:
+    """Network errors, 5xx and 429 say something about the bridge; other 4xx do not."""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return True
+    return response.status_code >= 500 or response.status_code == 429
 
-def build_rssbridge_url(channel: str) -> str:
+
+# ─── SCRAPER HELPERS (CONT.) ──────────────────────────────────────────────────
+
+def build_rssbridge_url(channel: str, base: str = RSS_BRIDGE_BASE) -> str:
     return (
-        f"{RSS_BRIDGE_BASE}?action=display"
+        f"{base}?action=display"
         f"&username={channel}"
         f"&bridge=TelegramBridge"
         f"&format=Plaintext"
     )
 
 
-def fetch_plaintext(channel: str) -> str | None:
-    """Fetch plaintext print_r payload from RSS-Bridge for one channel."""
-    url = build_rssbridge_url(channel)
-    try:
-        response = requests.get(
-            url,
-            timeout=REQUEST_TIMEOUT,
-            headers={"User-Agent": "Mozilla/5.0"},
-        )
-        response.raise_for_status()
-        return response.text
-    except requests.RequestException as exc:
-        log.error("Failed to fetch %s: %s", channel, exc)
+class ChannelHttpCache:
+    """
+    ETag / Last-Modified / payload hash per (bridge endpoint, channel), persisted as JSON.
+
+    A new response is only staged by `update`; `commit` records it once the
+    channel's posts have been stored, so a crash or a failed store in between
+    makes the next run fetch and parse the payload again.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries: dict[str, dict[str, dict]] = {}   # endpoint -> channel -> entry
+        self.pending: dict[str, tuple[str, dict]] = {}  # channel -> (endpoint, entry)
+        if os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                log.warning("Ignoring unreadable HTTP cache: %s", path)
+            else:
+                # files from before the per-endpoint layout map channel -> entry; drop them
+                self.entries = {
+                    base: channels
+                    for base, channels in entries.items()
+                    if isinstance(channels, dict) and "sha256" not in channels
+                }
+
+    def conditional_headers(self, channel: str, endpoint: str) -> dict[str, str]:
+        with self.lock:
+            entry = self.entries.get(endpoint, {}).get(channel, {})
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def update(self, channel: str, endpoint: str, response, digest: str) -> bool:
+        """Stage validators for a 200 response; returns True if the payload changed."""
+        with self.lock:
+            previous = self.entries.get(endpoint, {}).get(channel, {})
+            if previous.get("sha256") == digest:
+                return False
+            self.pending[channel] = (
+                endpoint,
+                {
+                    "etag": response.headers.get("ETag", ""),
+                    "last_modified": response.headers.get("Last-Modified", ""),
+                    "sha256": digest,
+                },
+            )
+        return True
+
+    def commit(self, channel: str) -> None:
+        """Keep the staged validators for `channel`; call after its posts are stored."""
+        with self.lock:
+            staged = self.pending.pop(channel, None)
+            if staged is not None:
+                endpoint, entry = staged
+                self.entries.setdefault(endpoint, {})[channel] = entry
+
+    def save(self) -> None:
+        with self.lock:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+
+
+def fetch_plaintext(channel: str, http_cache: ChannelHttpCache | None = None) -> str | None:
+    """
+    Fetch plaintext print_r payload from RSS-Bridge for one channel.
+
+    The request goes to the healthiest endpoint in `RSS_BRIDGE_POOL`; on a
+    bridge-side failure it is retried on another endpoint.
+
+    Returns None on failure and an empty string when `http_cache` shows the
+    payload is unchanged (HTTP 304 or identical content hash).
+    """
+    pool = get_bridge_pool()
+    tried: set[str] = set()
+    response = None
+    while len(tried) < max(1, BRIDGE_MAX_ATTEMPTS):
+        endpoint = pool.acquire(tried)
+        if endpoint is None:
+            if not tried:
+                log.warning("Every RSS-Bridge endpoint is cooling down; skipping %s this cycle.", channel)
+            break
+        tried.add(endpoint.base)
+        url = build_rssbridge_url(channel, endpoint.base)
+        headers = {"User-Agent": "Mozilla/5.0"}
+        if http_cache is not None:
+            headers.update(http_cache.conditional_headers(channel, endpoint.base))
+        wait_for_host(url)
+        start = time.monotonic()
+        try:
+            response = requests.get(
+                url,
+                timeout=REQUEST_TIMEOUT,
+                headers=headers,
+            )
+            if response.status_code != 304:
+                response.raise_for_status()
+        except requests.RequestException as exc:
+            retryable = is_retryable_fetch_error(exc)
+            # a 4xx is about the request, not the bridge: neither a failure nor a latency sample
+            pool.release(endpoint, False if retryable else None, time.monotonic() - start)
+            log.error("Failed to fetch %s from %s: %s", channel, endpoint.base, exc)
+            response = None
+            if not retryable:
+                return None
+            continue
+        pool.release(endpoint, True, time.monotonic() - start)
+        break
+
+    if response is None:
         return None
+    if response.status_code == 304:
+        return ""
+
+    if http_cache is not None:
+        digest = hashlib.sha256(response.content).hexdigest()
+        if not http_cache.update(channel, endpoint.base, response, digest):
+            return ""
+    return response.text
+
+
+_TAG_RE = re.compile(
+    r"<script\b.*?</script\s*>|<style\b.*?</style\s*>|<!--.*?-->|<[^>]*>",
+    re.DOTALL | re.IGNORECASE,
+)
+
+# one token per print_r key line: "    [key] => value"
+_PRINT_R_KEY_RE = re.compile(r"^[ \t]*\[([^\]\n]+)\] => ", re.MULTILINE)
+_ITEM_START_RE = re.compile(r"Array\s*\(")
+_URI_RE = re.compile(r"https?://\S+")
+_DIGITS_RE = re.compile(r"\d+")
+
+_POST_FIELDS = ("uri", "title", "timestamp", "content")
+
+
+def strip_html(raw: str) -> str:
+    """Lightweight tag stripper: same text/spacing as BeautifulSoup get_text(" ", strip=True)."""
+    pieces = (html.unescape(piece).strip() for piece in _TAG_RE.split(raw))
+    return " ".join(piece for piece in pieces if piece)
 
 
 def clean_html(raw: str) -> str:
     """Strip HTML tags and normalize spacing."""
-    return BeautifulSoup(raw, "html.parser").get_text(separator=" ", strip=True)
+    if HTML_CLEANER == "bs4":
+        return BeautifulSoup(raw, "html.parser").get_text(separator=" ", strip=True)
+    return strip_html(raw)
+
+
+def _build_post(fields: dict[str, str]) -> dict | None:
+    uri_match = _URI_RE.match(fields.get("uri", ""))
+    if not uri_match:
+        return None
+    url = uri_match.group(0).strip()
+
+    post: dict[str, str | int] = {"url": url, "title": fields.get("title", "").strip()}
+
+    ts_match = _DIGITS_RE.match(fields.get("timestamp", ""))
+    if ts_match:
+        ts = int(ts_match.group(0))
+        post["timestamp"] = ts
+        post["timestamp_human"] = datetime.utcfromtimestamp(ts).strftime(
+            "%Y-%m-%d %H:%M:%S UTC"
+        )
+    else:
+        post["timestamp"] = ""
+        post["timestamp_human"] = ""
+
+    content = fields.get("content", "").strip()
+    post["text"] = clean_html(content) if content else ""
+    post["post_id"] = url.rstrip("/").split("/")[-1]
+    return post
+
+
+def iter_print_r_posts(text: str):
+    """
+    Single pass over an RSS-Bridge plaintext print_r payload, yielding one
+    normalized post dict per item as soon as the item is complete.
+
+    Each `[key] => ` line is visited once; a key's value runs up to the next
+    key line. `[content]` runs up to `[enclosures]` because post HTML may
+    itself contain bracketed lines. Only the first uri/title/timestamp/content
+    of an item is used, matching the previous regex parser.
+    """
+    fields: dict[str, str] | None = None
+    current_key: str | None = None
+    value_start = 0
+
+    for match in _PRINT_R_KEY_RE.finditer(text):
+        key = match.group(1)
+        is_item = key.isdigit() and _ITEM_START_RE.match(text, match.end()) is not None
+        if current_key == "content" and key != "enclosures" and not is_item:
+            continue
+
+        # content only counts when terminated by [enclosures], as before
+        if (
+            fields is not None
+            and current_key is not None
+            and (current_key != "content" or key == "enclosures")
+        ):
+            fields[current_key] = text[value_start:match.start()]
+        current_key = None
+
+        if is_item:
+            if fields is not None:
+                post = _build_post(fields)
+                if post:
+                    yield post
+            fields = {}
+        elif fields is not None and key in _POST_FIELDS and key not in fields:
+            current_key = key
+            value_start = match.end()
+
+    if fields is not None:
+        if current_key is not None and current_key != "content":
+            fields[current_key] = text[value_start:]
+        post = _build_post(fields)
+        if post:
+            yield post
 
 
 def parse_print_r_payload(text: str) -> list[dict]:
     """
     Parse RSS-Bridge plaintext print_r format into normalized post dictionaries.
     """
+    return list(iter_print_r_posts(text))
+
+
+def parse_print_r_payload_legacy(text: str) -> list[dict]:
+    """Previous split + per-field regex parser, kept as the benchmark baseline."""
     posts: list[dict] = []
     item_blocks = re.split(r"\[\d+\] => Array\s*\(", text)
 
@@ -289,7 +1052,9 @@ def parse_print_r_payload(text: str) -> list[dict]:
             re.DOTALL,
         )
         if content_match:
-            post["text"] = clean_html(content_match.group(1).strip())
+            post["text"] = BeautifulSoup(
+                content_match.group(1).strip(), "html.parser"
+            ).get_text(separator=" ", strip=True)
         else:
             post["text"] = ""
 
@@ -300,38 +1065,92 @@ def parse_print_r_payload(text: str) -> list[dict]:
     return posts
 
 
-def scrape_all_channels() -> int:
-    """Scrape all configured channels and append only unseen URLs to raw CSV."""
-    log.info("Starting scrape run.")
-    seen_urls = load_seen_urls()
-    new_total = 0
+def benchmark_parser(path: str, repeat: int = 5) -> None:
+    """Time the single-pass parser against the legacy parser on a saved payload."""
+    with open(path, "r", encoding="utf-8") as f:
+        payload = f.read()
+
+    def best_of(func) -> tuple[float, list[dict]]:
+        best = float("inf")
+        result: list[dict] = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func(payload)
+            best = min(best, time.perf_counter() - start)
+        return best, result
+
+    legacy_time, legacy_posts = best_of(parse_print_r_payload_legacy)
+    fast_time, fast_posts = best_of(parse_print_r_payload)
+    differing = sum(1 for a, b in zip(legacy_posts, fast_posts) if a != b)
+    differing += abs(len(legacy_posts) - len(fast_posts))
+
+    print(f"Payload: {path} ({len(payload) / 1024:.1f} KiB, best of {repeat})")
+    print(f"  legacy parser: {legacy_time * 1000:.2f} ms, {len(legacy_posts)} posts")
+    print(f"  single-pass:   {fast_time * 1000:.2f} ms, {len(fast_posts)} posts")
+    if fast_time > 0:
+        print(f"  speedup:       {legacy_time / fast_time:.1f}x")
+    print(f"  posts that differ: {differing}")
+
+
+def select_new_posts(
+    channel: str,
+    parsed: list[dict],
+    seen_urls: SeenUrlIndex | SqlitePostStore,
+) -> list[dict]:
+    """Return posts whose URL is not in `seen_urls`, tagging them and marking them seen."""
+    new_posts: list[dict] = []
+    for post in parsed:
+        url = (post.get("url") or "").strip()
+        if url and url not in seen_urls:
+            post["channel"] = channel
+            new_posts.append(post)
+            seen_urls.add(url)
+    return new_posts
+
+
+def fetch_and_parse(channel: str, http_cache: ChannelHttpCache | None = None) -> list[dict] | None:
+    """Fetch one channel and parse it; returns None when the fetch failed."""
+    log.info("Fetching channel: %s", channel)
+    raw_text = fetch_plaintext(channel, http_cache)
+    if raw_text is None:
+        return None
+    if not raw_text:
+        log.info("Unchanged since last run: %s", channel)
+        return []
+    parsed = parse_print_r_payload(raw_text)
+    log.info("Parsed %s posts from %s", len(parsed), channel)
+    return parsed
 
-    for channel in CHANNELS:
-        log.info("Fetching channel: %s", channel)
-        raw_text = fetch_plaintext(channel)
-        if not raw_text:
-            continue
 
-        parsed = parse_print_r_payload(raw_text)
-        log.info("Parsed %s posts from %s", len(parsed), channel)
-
-        new_posts: list[dict] = []
-        for post in parsed:
-            url = (post.get("url") or "").strip()
-            if url and url not in seen_urls:
-                post["channel"] = channel
-                new_posts.append(post)
-                seen_urls.add(url)
-
-        if new_posts:
-            append_raw_posts(new_posts)
-            log.info("Saved %s new posts for %s", len(new_posts), channel)
-            new_total += len(new_posts)
-        else:
-            log.info("No new posts for %s", channel)
+def scrape_all_channels() -> int:
+    """Scrape all configured channels and store only unseen URLs."""
+    log.info("Starting scrape run (%s worker(s)).", FETCH_CONCURRENCY)
+    seen_urls = open_post_store()
+    http_cache = ChannelHttpCache(HTTP_CACHE_FILE) if USE_HTTP_CACHE else None
+    new_total = 0
 
-        time.sleep(2)
+    # map() yields results in CHANNELS order, so dedupe and append order match
+    # a sequential sweep even though fetches overlap.
+    with ThreadPoolExecutor(max_workers=max(1, FETCH_CONCURRENCY)) as pool:
+        results = pool.map(lambda channel: fetch_and_parse(channel, http_cache), CHANNELS)
+        for channel, parsed in zip(CHANNELS, results):
+            if parsed is None:
+                continue
 
+            new_posts = select_new_posts(channel, parsed, seen_urls)
+            if new_posts:
+                store_new_posts(new_posts, seen_urls)
+                log.info("Saved %s new posts for %s", len(new_posts), channel)
+                new_total += len(new_posts)
+            else:
+                log.info("No new posts for %s", channel)
+            if http_cache is not None:
+                http_cache.commit(channel)
+
+    seen_urls.close()
+    if http_cache is not None:
+        http_cache.save()
+    get_bridge_pool().log_health()
     log.info("Scrape complete. Total new posts saved: %s", new_total)
     return new_total
 
@@ -357,11 +1176,14 @@ def row_unix_ts(row: dict) -> int | None:
         return None
 
 
-def row_matches_keywords(row: dict, keywords_lower: list[str]) -> bool:
-    if not keywords_lower:
+def build_keyword_matcher(keywords_lower: list[str]) -> KeywordMatcher:
+    return KeywordMatcher(keywords_lower, whole_words=KEYWORD_WHOLE_WORDS)
+
+
+def row_matches_keywords(row: dict, matcher: KeywordMatcher) -> bool:
+    if not matcher:
         return True
-    haystack = f"{row.get('title', '')} {row.get('text', '')}".lower()
-    return any(keyword in haystack for keyword in keywords_lower)
+    return matcher.search(f"{row.get('title', '')} {row.get('text', '')}")
 
 
 def timestamp_human_to_ts(value: str) -> int:
@@ -420,8 +1242,428 @@ def merge_and_dedupe_rows(
     return result
 
 
+def filter_settings_fingerprint(keywords_lower: list[str]) -> str:
+    """Hash of the settings that decide which raw rows match; a change forces a rescan."""
+    payload = json.dumps(
+        {
+            "keywords": sorted(keywords_lower),
+            "days": DAYS_WINDOW,
+            "whole_words": KEYWORD_WHOLE_WORDS,
+        }
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_filter_state() -> dict:
+    if not os.path.isfile(FILTER_STATE_FILE):
+        return {}
+    try:
+        with open(FILTER_STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_filter_state(offset: int, fingerprint: str) -> None:
+    with open(FILTER_STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump({"offset": offset, "fingerprint": fingerprint}, f)
+
+
+class RawTail:
+    """
+    Raw CSV rows that start at byte `offset` (0 = whole file), streamed one
+    line at a time. After iterating, `end` is the byte offset just past the
+    last complete row (the next high-water mark) and `count` the number of rows.
+    A trailing line without its newline is still being written by the scraper,
+    so it is left for the next run.
+    """
+
+    def __init__(self, offset: int) -> None:
+        self.offset = offset
+        self.end = offset
+        self.count = 0
+        self._pos = offset
+        self._truncated = False
+
+    def _decoded_lines(self, f):
+        # binary lines keep their "\r\n", as a file opened with newline="" would
+        for line in f:
+            if not line.endswith(b"\n"):
+                self._truncated = True
+                return
+            self._pos += len(line)
+            yield line.decode("utf-8")
+
+    def __iter__(self):
+        with open(RAW_CSV_FILE, "rb") as f:
+            header_line = f.readline()
+            self.end = f.tell()
+            fieldnames = next(csv.reader([header_line.decode("utf-8")]), None)
+            if not fieldnames:
+                return
+            f.seek(max(self.offset, self.end))
+            self.end = self._pos = f.tell()
+            reader = csv.DictReader(self._decoded_lines(f), fieldnames=fieldnames)
+            try:
+                for row in reader:
+                    if self._truncated:
+                        # the reader hit the partial last line inside a quoted field
+                        return
+                    # the reader has consumed exactly this row's lines
+                    self.end = self._pos
+                    self.count += 1
+                    yield row
+            except csv.Error:
+                # a quoted multi-line row cut off by the partial last line
+                return
+
+
+_WORD_RE = re.compile(r"\w+")
+
+MINHASH_PERMUTATIONS = 64
+_MINHASH_PRIME = (1 << 61) - 1
+_minhash_rng = random.Random(20240101)
+_MINHASH_PARAMS = [
+    (_minhash_rng.randrange(1, _MINHASH_PRIME), _minhash_rng.randrange(0, _MINHASH_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+
+def minhash_signature(text: str) -> list[int] | None:
+    """MinHash of the word-pair shingles of `text`; None if the text is too short."""
+    tokens = _WORD_RE.findall(text.lower())
+    if len(tokens) < NEAR_DUP_MIN_TOKENS:
+        return None
+    shingles = {
+        int.from_bytes(
+            hashlib.blake2b(f"{a} {b}".encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        for a, b in zip(tokens, tokens[1:])
+    }
+    return [
+        min((a * x + b) % _MINHASH_PRIME for x in shingles)
+        for a, b in _MINHASH_PARAMS
+    ]
+
+
+def lsh_rows_per_band(similarity: float) -> int:
+    """
+    Rows per LSH band so that the band threshold (1/b) ** (1/r) sits just under
+    `similarity`: near duplicates collide in some band, unrelated posts rarely do.
+    """
+    best = 1
+    for rows in (1, 2, 4, 8, 16, 32):
+        bands = MINHASH_PERMUTATIONS // rows
+        if (1 / bands) ** (1 / rows) <= similarity - 0.05:
+            best = rows
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    On-disk MinHash/LSH index that assigns each post to a near-duplicate cluster.
+
+    Signatures are split into bands; only posts sharing a band bucket are
+    compared, so a lookup does not scan every stored signature. `prune`
+    drops posts older than the filter window.
+    """
+
+    def __init__(self, path: str, similarity: float) -> None:
+        self.similarity = similarity
+        self.rows = lsh_rows_per_band(similarity)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS signatures (
+                url TEXT PRIMARY KEY,
+                minhash TEXT,
+                cluster TEXT
+            );
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER,
+                bucket TEXT,
+                url TEXT
+            );
+            CREATE INDEX IF NOT EXISTS bands_lookup ON bands (band, bucket);
+            CREATE INDEX IF NOT EXISTS bands_url ON bands (url);
+            """
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(signatures)")}
+        if "ts" not in columns:
+            # post timestamp, for pruning; older index files have none and are pruned first
+            self.conn.execute("ALTER TABLE signatures ADD COLUMN ts INTEGER")
+        self.conn.executescript(
+            """
+            CREATE INDEX IF NOT EXISTS signatures_ts ON signatures (ts);
+            CREATE INDEX IF NOT EXISTS signatures_cluster ON signatures (cluster);
+            """
+        )
+        self.conn.commit()
+
+    def band_buckets(self, signature: list[int]) -> list[tuple[int, str]]:
+        return [
+            (
+                band,
+                hashlib.blake2b(
+                    repr(signature[start:start + self.rows]).encode("ascii"), digest_size=8
+                ).hexdigest(),
+            )
+            for band, start in enumerate(range(0, len(signature), self.rows))
+        ]
+
+    def cluster_of(self, url: str) -> str | None:
+        """Cluster URL of a registered post, or None if it is not in the index."""
+        row = self.conn.execute("SELECT cluster FROM signatures WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def cluster_for(self, url: str, text: str, ts: int) -> str:
+        """Return the cluster URL for a post, registering it if it is new."""
+        row = self.conn.execute("SELECT cluster FROM signatures WHERE url = ?", (url,)).fetchone()
+        if row:
+            return row[0]
+
+        signature = minhash_signature(text)
+        if signature is None:
+            return url
+
+        buckets = self.band_buckets(signature)
+        best: tuple[float, str] | None = None
+        checked: set[str] = set()
+        for band, bucket in buckets:
+            cur = self.conn.execute(
+                "SELECT s.url, s.minhash, s.cluster FROM bands b "
+                "JOIN signatures s ON s.url = b.url WHERE b.band = ? AND b.bucket = ?",
+                (band, bucket),
+            )
+            for other_url, other_sig, cluster in cur:
+                if other_url in checked:
+                    continue
+                checked.add(other_url)
+                other = json.loads(other_sig)
+                similarity = sum(x == y for x, y in zip(signature, other)) / len(signature)
+                if similarity >= self.similarity and (best is None or similarity > best[0]):
+                    best = (similarity, cluster)
+
+        cluster = best[1] if best else url
+        self.conn.execute(
+            "INSERT INTO signatures (url, minhash, cluster, ts) VALUES (?, ?, ?, ?)",
+            (url, json.dumps(signature), cluster, ts),
+        )
+        self.conn.executemany(
+            "INSERT INTO bands (band, bucket, url) VALUES (?, ?, ?)",
+            ((band, bucket, url) for band, bucket in buckets),
+        )
+        return cluster
+
+    def prune(self, cutoff: int) -> int:
+        """
+        Delete posts older than `cutoff` and give each cluster whose first post
+        was deleted a new head: its oldest remaining post. Returns posts deleted.
+        """
+        self.conn.execute(
+            "DELETE FROM bands WHERE url IN "
+            "(SELECT url FROM signatures WHERE ts IS NULL OR ts < ?)",
+            (cutoff,),
+        )
+        deleted = self.conn.execute(
+            "DELETE FROM signatures WHERE ts IS NULL OR ts < ?", (cutoff,)
+        ).rowcount
+        if deleted:
+            orphaned = self.conn.execute(
+                "SELECT DISTINCT cluster FROM signatures "
+                "WHERE cluster NOT IN (SELECT url FROM signatures)"
+            ).fetchall()
+            for (cluster,) in orphaned:
+                (head,) = self.conn.execute(
+                    "SELECT url FROM signatures WHERE cluster = ? ORDER BY ts, url LIMIT 1",
+                    (cluster,),
+                ).fetchone()
+                self.conn.execute(
+                    "UPDATE signatures SET cluster = ? WHERE cluster = ?", (head, cluster)
+                )
+        self.conn.commit()
+        return deleted
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+
+def annotate_near_duplicates(rows: list[tuple[int, dict]], cutoff: int) -> None:
+    """Fill `duplicate_of` for rows whose title + text nearly matches an earlier post."""
+    index = NearDuplicateIndex(NEAR_DUP_INDEX_FILE, NEAR_DUP_SIMILARITY)
+    # never cluster new posts under one that has left the window
+    index.prune(cutoff)
+    clusters = 0
+    for ts, row in rows:
+        url = (row.get("url") or "").strip()
+        if not url:
+            continue
+        cluster = index.cluster_for(url, f"{row.get('title', '')} {row.get('text', '')}", ts)
+        row["duplicate_of"] = "" if cluster == url else cluster
+        clusters += cluster != url
+    index.close()
+    if clusters:
+        log.info("Marked %s near-duplicate post(s).", clusters)
+
+
+def refresh_near_duplicates(rows: list[dict], cutoff: int) -> None:
+    """
+    Before the filtered output is rewritten: prune the index to the window and
+    re-point `duplicate_of` in `rows` that named a post which has aged out.
+    """
+    if not NEAR_DUP_ENABLED:
+        return
+    index = NearDuplicateIndex(NEAR_DUP_INDEX_FILE, NEAR_DUP_SIMILARITY)
+    pruned = index.prune(cutoff)
+    for row in rows:
+        url = (row.get("url") or "").strip()
+        cluster = index.cluster_of(url) if url else None
+        if cluster is not None:
+            row["duplicate_of"] = "" if cluster == url else cluster
+    index.close()
+    if pruned:
+        log.info("Pruned %s post(s) older than the window from the near-duplicate index.", pruned)
+
+
+def filter_raw_rows(rows, cutoff: int, keywords_lower: list[str]) -> list[tuple[int, dict]]:
+    """Keep rows inside the date window that match the keywords, shaped for output."""
+    matcher = build_keyword_matcher(keywords_lower)
+    fresh: list[tuple[int, dict]] = []
+    for row in rows:
+        ts = row_unix_ts(row)
+        if ts is None or ts < cutoff:
+            continue
+        if not row_matches_keywords(row, matcher):
+            continue
+
+        out = {header: row.get(header, "") for header in FILTERED_CSV_HEADERS}
+        out["title"] = normalize_newlines_to_spaces(out.get("title", ""))
+        out["text"] = normalize_newlines_to_spaces(out.get("text", ""))
+        fresh.append((ts, out))
+
+    if NEAR_DUP_ENABLED and fresh:
+        annotate_near_duplicates(fresh, cutoff)
+    return fresh
+
+
+def write_filtered_rows(rows: list[dict]) -> None:
+    with open(FILTERED_CSV_FILE, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FILTERED_CSV_HEADERS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def append_filtered_rows(rows: list[dict]) -> None:
+    with open(FILTERED_CSV_FILE, "a", encoding="utf-8", newline="") as f:
+        csv.DictWriter(f, fieldnames=FILTERED_CSV_HEADERS).writerows(rows)
+
+
+def process_filtered_output_incremental() -> int:
+    """
+    Filter only raw rows appended since the last run and append new matches to
+    the filtered CSV. The file is only rewritten (sorted newest first) when
+    rows fell out of `DAYS_WINDOW` or the archive is rescanned; appended
+    batches go at the end, each newest first.
+    """
+    if not os.path.isfile(RAW_CSV_FILE):
+        print(f"Input not found: {RAW_CSV_FILE}", file=sys.stderr)
+        return 1
+
+    cutoff = int((datetime.now(timezone.utc) - timedelta(days=DAYS_WINDOW)).timestamp())
+    keywords_lower = [k.strip().lower() for k in KEYWORDS if k.strip()]
+    fingerprint = filter_settings_fingerprint(keywords_lower)
+
+    state = load_filter_state()
+    offset = int(state.get("offset", 0))
+    if state.get("fingerprint") != fingerprint or offset > os.path.getsize(RAW_CSV_FILE):
+        if state:
+            print("Filter settings or raw CSV changed; rescanning full archive.")
+        offset = 0
+
+    existing_rows, existing_urls = load_existing_filtered_rows()
+    kept_rows = [(ts, row) for ts, row in existing_rows if ts >= cutoff]
+    expired = len(existing_rows) - len(kept_rows)
+
+    rows = RawTail(offset)
+    fresh = filter_raw_rows(rows, cutoff, keywords_lower)
+
+    added = merge_and_dedupe_rows([], [
+        (ts, row) for ts, row in fresh if (row.get("url") or "").strip() not in existing_urls
+    ])
+
+    if offset == 0 or expired or not os.path.isfile(FILTERED_CSV_FILE):
+        final_rows = merge_and_dedupe_rows(kept_rows, fresh)
+        refresh_near_duplicates(final_rows, cutoff)
+        write_filtered_rows(final_rows)
+        print(
+            f"Wrote {len(final_rows)} rows to {FILTERED_CSV_FILE} "
+            f"({len(added)} new URL(s), {expired} expired, "
+            f"{rows.count} raw row(s) scanned)."
+        )
+    elif added:
+        append_filtered_rows(added)
+        print(
+            f"Appended {len(added)} new row(s) to {FILTERED_CSV_FILE} "
+            f"({rows.count} raw row(s) scanned)."
+        )
+    else:
+        print(f"No changes to {FILTERED_CSV_FILE} ({rows.count} raw row(s) scanned).")
+
+    save_filter_state(rows.end, fingerprint)
+    return 0
+
+
+def process_filtered_output_sqlite() -> int:
+    """
+    Filter posts from the SQLite store. Only rows with timestamp inside the
+    window are read (timestamp index); with `INCREMENTAL_FILTER` only rows
+    inserted since the last run are read and expired rows are deleted.
+    """
+    cutoff = int((datetime.now(timezone.utc) - timedelta(days=DAYS_WINDOW)).timestamp())
+    keywords_lower = [k.strip().lower() for k in KEYWORDS if k.strip()]
+    fingerprint = filter_settings_fingerprint(keywords_lower)
+
+    store = SqlitePostStore(POSTS_DB_FILE)
+    after_rowid = 0
+    if INCREMENTAL_FILTER and store.get_meta("filter_fingerprint") == fingerprint:
+        after_rowid = int(store.get_meta("filter_rowid") or 0)
+    upto_rowid = store.max_rowid()
+
+    fresh = filter_raw_rows(
+        store.iter_posts_since(cutoff, after_rowid, upto_rowid), cutoff, keywords_lower
+    )
+    known = store.filtered_urls((row.get("url") or "").strip() for _, row in fresh)
+    added_by_url = sum(1 for _, row in fresh if (row.get("url") or "").strip() not in known)
+
+    store.upsert_filtered(fresh)
+    expired = store.expire_filtered(cutoff) if INCREMENTAL_FILTER else 0
+
+    if fresh or expired or not os.path.isfile(FILTERED_CSV_FILE):
+        final_rows = store.filtered_rows()
+        refresh_near_duplicates(final_rows, cutoff)
+        write_filtered_rows(final_rows)
+        print(
+            f"Wrote {len(final_rows)} rows to {FILTERED_CSV_FILE} "
+            f"({added_by_url} new URL(s), {expired} expired)."
+        )
+    else:
+        print(f"No changes to {FILTERED_CSV_FILE}.")
+
+    store.set_meta("filter_rowid", str(upto_rowid))
+    store.set_meta("filter_fingerprint", fingerprint)
+    store.close()
+    return 0
+
+
 def process_filtered_output() -> int:
     """Filter recent keyword-matched rows from raw CSV into filtered CSV output."""
+    if STORAGE_BACKEND == "sqlite":
+        return process_filtered_output_sqlite()
+    if INCREMENTAL_FILTER:
+        return process_filtered_output_incremental()
+
     if not os.path.isfile(RAW_CSV_FILE):
         print(f"Input not found: {RAW_CSV_FILE}", file=sys.stderr)
         return 1
@@ -433,34 +1675,19 @@ def process_filtered_output() -> int:
     if existing_rows:
         print("Found existing filtered CSV; merging new matches.")
 
-    fresh: list[tuple[int, dict]] = []
     with open(RAW_CSV_FILE, "r", encoding="utf-8", newline="") as f:
         reader = csv.DictReader(f)
         if reader.fieldnames is None:
             print("Raw CSV has no header row.", file=sys.stderr)
             return 1
-
-        for row in reader:
-            ts = row_unix_ts(row)
-            if ts is None or ts < cutoff:
-                continue
-            if not row_matches_keywords(row, keywords_lower):
-                continue
-
-            out = {header: row.get(header, "") for header in FILTERED_CSV_HEADERS}
-            out["title"] = normalize_newlines_to_spaces(out.get("title", ""))
-            out["text"] = normalize_newlines_to_spaces(out.get("text", ""))
-            fresh.append((ts, out))
+        fresh = filter_raw_rows(reader, cutoff, keywords_lower)
 
     added_by_url = sum(
         1 for _, row in fresh if (row.get("url") or "").strip() not in existing_urls
     )
     final_rows = merge_and_dedupe_rows(existing_rows, fresh)
-
-    with open(FILTERED_CSV_FILE, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=FILTERED_CSV_HEADERS)
-        writer.writeheader()
-        writer.writerows(final_rows)
+    refresh_near_duplicates(final_rows, cutoff)
+    write_filtered_rows(final_rows)
 
     if existing_rows:
         print(
@@ -473,8 +1700,214 @@ def process_filtered_output() -> int:
     return 0
 
 
+# ─── DAEMON MODE ──────────────────────────────────────────────────────────────
+
+def estimate_channel_rates() -> dict[str, float]:
+    """
+    Posts per second for each channel over the last `RATE_LOOKBACK_DAYS` of the archive.
+    For CSV storage only the last `RATE_TAIL_BYTES` of the raw file are read (rows are
+    appended in time order); if that covers less than the lookback, the rate is taken
+    over the span it does cover.
+    """
+    lookback = RATE_LOOKBACK_DAYS * 86400
+    cutoff = int(time.time()) - lookback
+    counts: dict[str, int] = {}
+
+    if STORAGE_BACKEND == "sqlite":
+        store = SqlitePostStore(POSTS_DB_FILE)
+        cur = store.conn.execute(
+            "SELECT channel, COUNT(*) FROM posts WHERE timestamp >= ? GROUP BY channel",
+            (cutoff,),
+        )
+        counts = {channel: count for channel, count in cur}
+        store.close()
+    elif os.path.isfile(RAW_CSV_FILE):
+        size = os.path.getsize(RAW_CSV_FILE)
+        offset = 0
+        if size > RATE_TAIL_BYTES:
+            with open(RAW_CSV_FILE, "rb") as f:
+                f.seek(size - RATE_TAIL_BYTES)
+                f.readline()  # skip to the next line start
+                offset = f.tell()
+        oldest = None
+        for row in RawTail(offset):
+            ts = row_unix_ts(row)
+            if ts is None:
+                continue
+            oldest = ts if oldest is None else min(oldest, ts)
+            if ts >= cutoff:
+                channel = row.get("channel", "")
+                counts[channel] = counts.get(channel, 0) + 1
+        if offset and oldest is not None:
+            lookback = max(1, min(lookback, int(time.time()) - oldest))
+
+    return {channel: count / lookback for channel, count in counts.items()}
+
+
+class PollScheduler:
+    """
+    Priority queue of channels keyed by next poll time.
+
+    Each channel's interval follows its learned posting rate: busy channels
+    are polled often, channels that keep returning nothing back off
+    exponentially, and failures back off separately. Every interval is
+    jittered so polls do not line up.
+    """
+
+    def __init__(self, channels: list[str], rates: dict[str, float]) -> None:
+        self.rates = {channel: rates.get(channel, 0.0) for channel in channels}
+        self.intervals: dict[str, float] = {}
+        self.failures: dict[str, int] = {channel: 0 for channel in channels}
+        self.heap: list[tuple[float, str]] = []
+        now = time.time()
+        for channel in channels:
+            self.intervals[channel] = self.interval_for_rate(self.rates[channel])
+            # spread the first sweep out instead of firing every channel at once
+            heapq.heappush(self.heap, (now + random.uniform(0, POLL_MIN_SECONDS), channel))
+
+    @staticmethod
+    def interval_for_rate(rate: float) -> float:
+        if rate <= 0:
+            return float(POLL_MAX_SECONDS)
+        return min(max(POLL_TARGET_POSTS / rate, POLL_MIN_SECONDS), POLL_MAX_SECONDS)
+
+    def schedule(self, channel: str, delay: float) -> None:
+        delay *= 1 + random.uniform(-POLL_JITTER, POLL_JITTER)
+        heapq.heappush(self.heap, (time.time() + delay, channel))
+
+    def pop_due(self, now: float) -> str | None:
+        if self.heap and self.heap[0][0] <= now:
+            return heapq.heappop(self.heap)[1]
+        return None
+
+    def seconds_until_next(self, now: float) -> float:
+        if not self.heap:
+            return float(POLL_MAX_SECONDS)
+        return max(0.0, self.heap[0][0] - now)
+
+    def record_success(self, channel: str, parsed: list[dict], new_count: int) -> None:
+        timestamps = [post["timestamp"] for post in parsed if isinstance(post.get("timestamp"), int)]
+        if timestamps:
+            # posts per second from the oldest returned post until now, so a
+            # channel that went quiet after a burst reads as slow, not busy
+            span = max(time.time() - min(timestamps), POLL_MIN_SECONDS)
+            observed = len(timestamps) / span
+            self.rates[channel] = 0.5 * self.rates[channel] + 0.5 * observed
+
+        self.failures[channel] = 0
+        if new_count:
+            interval = self.interval_for_rate(self.rates[channel])
+        else:
+            interval = min(self.intervals[channel] * POLL_BACKOFF, POLL_MAX_SECONDS)
+        self.intervals[channel] = interval
+        self.schedule(channel, interval)
+
+    def record_failure(self, channel: str) -> None:
+        self.failures[channel] += 1
+        delay = min(POLL_MIN_SECONDS * POLL_BACKOFF ** self.failures[channel], POLL_MAX_SECONDS)
+        self.schedule(channel, delay)
+
+
+def run_daemon() -> int:
+    """Poll channels forever on an adaptive schedule; Ctrl+C to stop."""
+    if STORAGE_BACKEND == "csv":
+        ensure_raw_csv_exists()
+    store = open_post_store()
+    http_cache = ChannelHttpCache(HTTP_CACHE_FILE) if USE_HTTP_CACHE else None
+    scheduler = PollScheduler(CHANNELS, estimate_channel_rates())
+    workers = max(1, DAEMON_WORKERS)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    in_flight: dict = {}
+    last_filter = time.time()
+    log.info("Daemon started: %s channels, %s worker(s).", len(CHANNELS), workers)
+
+    try:
+        while True:
+            now = time.time()
+            while len(in_flight) < workers:
+                channel = scheduler.pop_due(now)
+                if channel is None:
+                    break
+                in_flight[pool.submit(fetch_and_parse, channel, http_cache)] = channel
+
+            timeout = max(0.0, FILTER_EVERY_SECONDS - (now - last_filter))
+            if len(in_flight) < workers:
+                # with every worker busy a due channel cannot start anyway, so only
+                # a finished fetch (or the filter deadline) should wake the loop
+                timeout = min(timeout, scheduler.seconds_until_next(now))
+            if in_flight:
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            else:
+                time.sleep(timeout)
+                done = set()
+
+            for future in done:
+                channel = in_flight.pop(future)
+                try:
+                    parsed = future.result()
+                    if parsed is None:
+                        scheduler.record_failure(channel)
+                        continue
+                    new_posts = select_new_posts(channel, parsed, store)
+                    if new_posts:
+                        store_new_posts(new_posts, store)
+                        log.info("Saved %s new posts for %s", len(new_posts), channel)
+                    if http_cache is not None:
+                        http_cache.commit(channel)
+                except Exception:
+                    # a bad feed or storage hiccup must not stop the daemon
+                    log.exception("Polling %s failed", channel)
+                    scheduler.record_failure(channel)
+                    continue
+                scheduler.record_success(channel, parsed, len(new_posts))
+                log.info(
+                    "Next poll of %s in ~%.0fs", channel, scheduler.intervals[channel]
+                )
+
+            if time.time() - last_filter >= FILTER_EVERY_SECONDS:
+                process_filtered_output()
+                if http_cache is not None:
+                    http_cache.save()
+                last_filter = time.time()
+    except KeyboardInterrupt:
+        log.info("Stopping daemon.")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        store.close()
+        if http_cache is not None:
+            http_cache.save()
+    return 0
+
+
 def main() -> int:
-    ensure_raw_csv_exists()
+    parser = argparse.ArgumentParser(description="Scrape and filter Telegram channels via RSS-Bridge.")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="run continuously with adaptive per-channel polling",
+    )
+    parser.add_argument(
+        "--migrate-csv",
+        action="store_true",
+        help="import the existing CSV archive into the SQLite store and exit",
+    )
+    parser.add_argument(
+        "--benchmark-parser",
+        metavar="PAYLOAD",
+        help="benchmark the print_r parser on a saved RSS-Bridge response and exit",
+    )
+    args = parser.parse_args()
+
+    if args.benchmark_parser:
+        benchmark_parser(args.benchmark_parser)
+        return 0
+    if args.migrate_csv:
+        return migrate_csv_to_sqlite()
+    if args.daemon:
+        return run_daemon()
+
+    if STORAGE_BACKEND == "csv":
+        ensure_raw_csv_exists()
     new_scraped = scrape_all_channels()
     process_exit = process_filtered_output()
     print(f"Done. Newly scraped posts this run: {new_scraped}")
@@ -0,0 +1,263 @@
+"""
+Shared on-disk cache for threat-intelligence lookups.
+
+Used by the IP lookup scripts (VirusTotal, AbuseIPDB, GreyNoise, OTX, Shodan,
+ipinfo) and the collectors in cti_report_ip_address.py so the same indicator is
+not paid for twice while its answer is still fresh.
+
+- Entries are keyed on (provider, indicator, parameters).
+- Each provider has its own TTL (PROVIDER_TTLS).
+- "No data" answers (HTTP 404, empty bodies, or a fetch raising NoData) are
+  cached too, for NEGATIVE_TTL, so repeated misses do not burn quota.
+- Network errors and other failures are never cached.
+- The cache holds at most MAX_ENTRIES rows; the least recently used are evicted.
+- Hit/miss counters are kept per provider; `stats()` returns them along with
+  the totals from previous runs.
+
+The cache lives in `ti_cache.sqlite3` next to this file unless the
+`ti_cache_path` environment variable points elsewhere.
+
+Usage:
+    from ti_cache import fetch_json, get_cache
+
+    data = fetch_json("virustotal", ip, url, headers=headers)  # None if no data
+    host = get_cache().lookup("shodan", ip, lambda: api.host(ip))
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from rate_limiter import request
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_PATH = os.getenv("ti_cache_path") or os.path.join(SCRIPT_DIR, "ti_cache.sqlite3")
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+PROVIDER_TTLS = {
+    "virustotal": DAY,
+    "abuseipdb": 6 * HOUR,
+    "greynoise": 12 * HOUR,
+    "otx": DAY,
+    "shodan": DAY,
+    "ipinfo": 7 * DAY,
+    "proxycheck": 12 * HOUR,
+    "whois": 7 * DAY,
+}
+DEFAULT_TTL = DAY
+NEGATIVE_TTL = 6 * HOUR
+MAX_ENTRIES = 100_000
+LRU_TOUCH_SECONDS = 600      # a hit refreshes last_access at most this often
+
+
+class NoData(Exception):
+    """Raised by a fetch function when the provider has nothing for the indicator."""
+
+
+class TICache:
+    """SQLite-backed TTL + LRU cache, safe to share between threads."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                provider TEXT,
+                value TEXT,
+                negative INTEGER,
+                expires_at REAL,
+                last_access REAL
+            );
+            CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+            CREATE TABLE IF NOT EXISTS stats (
+                provider TEXT PRIMARY KEY,
+                hits INTEGER,
+                negative_hits INTEGER,
+                misses INTEGER
+            );
+            """
+        )
+        self.conn.commit()
+        self.counters: dict[str, dict[str, int]] = {}
+        # upper bound on the row count: every set() adds one (a replace really adds none),
+        # so the table is only counted again once the bound passes max_entries
+        self.approx_entries = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @staticmethod
+    def make_key(provider: str, indicator: str, params: dict | None = None) -> str:
+        return json.dumps([provider, str(indicator).strip().lower(), params or {}], sort_keys=True)
+
+    def _count(self, provider: str, field: str) -> None:
+        counters = self.counters.setdefault(provider, {"hits": 0, "negative_hits": 0, "misses": 0})
+        counters[field] += 1
+
+    def get(self, provider: str, indicator: str, params: dict | None = None) -> tuple[bool, object]:
+        """Return (found, value); value is None for a cached "no data" answer."""
+        key = self.make_key(provider, indicator, params)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, negative, expires_at, last_access FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[2] < now:
+                self._count(provider, "misses")
+                return False, None
+            # LRU only needs coarse times; skip the write (and its lock) on most hits
+            if now - row[3] >= LRU_TOUCH_SECONDS:
+                self.conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+                self.conn.commit()
+            if row[1]:
+                self._count(provider, "negative_hits")
+                return True, None
+            self._count(provider, "hits")
+            return True, json.loads(row[0])
+
+    def set(
+        self,
+        provider: str,
+        indicator: str,
+        value: object,
+        params: dict | None = None,
+        negative: bool = False,
+    ) -> None:
+        ttl = NEGATIVE_TTL if negative else PROVIDER_TTLS.get(provider, DEFAULT_TTL)
+        now = time.time()
+        payload = None if negative else json.dumps(value, default=str)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, provider, value, negative, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.make_key(provider, indicator, params), provider, payload, int(negative), now + ttl, now),
+            )
+            self._evict_locked()
+            self.conn.commit()
+
+    def lookup(self, provider: str, indicator: str, fetch, params: dict | None = None):
+        """
+        Return the cached value, or call `fetch()` and cache its result.
+
+        `fetch` may raise NoData or return None/{}/[] for "no data" (cached
+        negatively, returned as None); any other exception propagates uncached.
+        """
+        found, value = self.get(provider, indicator, params)
+        if found:
+            return value
+        try:
+            value = fetch()
+        except NoData:
+            value = None
+        if value is None or value == {} or value == []:
+            self.set(provider, indicator, None, params, negative=True)
+            return None
+        self.set(provider, indicator, value, params)
+        return value
+
+    def _evict_locked(self) -> None:
+        self.approx_entries += 1
+        if self.approx_entries <= self.max_entries:
+            return
+        target = int(self.max_entries * 0.9)
+        count = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        self.approx_entries = count
+        if count <= target:
+            return
+        # drop expired rows first, then least recently used down to 90% of the cap;
+        # trimming whenever we count leaves 10% headroom before the next count
+        self.conn.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),))
+        count = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        excess = count - target
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY last_access LIMIT ?)",
+                (excess,),
+            )
+            self.approx_entries = count - excess
+        else:
+            self.approx_entries = count
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Per-provider counters: this process plus totals persisted by earlier runs."""
+        with self.lock:
+            totals = {
+                provider: {"hits": hits, "negative_hits": negative_hits, "misses": misses}
+                for provider, hits, negative_hits, misses in self.conn.execute(
+                    "SELECT provider, hits, negative_hits, misses FROM stats"
+                )
+            }
+            for provider, counters in self.counters.items():
+                row = totals.setdefault(provider, {"hits": 0, "negative_hits": 0, "misses": 0})
+                for field, value in counters.items():
+                    row[field] += value
+        return totals
+
+    def flush_stats(self) -> None:
+        """Add this process's counters to the persisted totals."""
+        with self.lock:
+            for provider, c in self.counters.items():
+                self.conn.execute(
+                    "INSERT INTO stats (provider, hits, negative_hits, misses) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(provider) DO UPDATE SET hits = hits + excluded.hits, "
+                    "negative_hits = negative_hits + excluded.negative_hits, "
+                    "misses = misses + excluded.misses",
+                    (provider, c["hits"], c["negative_hits"], c["misses"]),
+                )
+            self.conn.commit()
+            self.counters = {}
+
+
+_cache: TICache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> TICache:
+    """Process-wide cache instance; stats are persisted at interpreter exit."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TICache()
+            atexit.register(_cache.flush_stats)
+        return _cache
+
+
+def fetch_json(
+    provider: str,
+    indicator: str,
+    url: str,
+    params: dict | None = None,
+    headers: dict | None = None,
+    timeout: float = 10,
+    cache_params: dict | None = None,
+):
+    """
+    GET `url` and return its JSON body, through the shared cache.
+
+    Cache misses are sent through rate_limiter, so only real requests count
+    against the provider's limits. Returns None when the provider answered 404
+    (cached negatively). Other HTTP and network errors raise requests
+    exceptions, and an exhausted daily quota raises rate_limiter.QuotaExceeded;
+    neither is cached.
+    `cache_params` (default: `params`) is the part of the request that identifies
+    the answer; keep API keys out of it.
+    """
+    def fetch():
+        r = request(provider, "GET", url, params=params, headers=headers, timeout=timeout)
+        if r.status_code == 404:
+            raise NoData()
+        r.raise_for_status()
+        return r.json()
+
+    return get_cache().lookup(
+        provider, indicator, fetch, cache_params if cache_params is not None else params
+    )
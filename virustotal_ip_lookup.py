@@ -3,6 +3,9 @@ import os
 import json
 from dotenv import load_dotenv
 
+from rate_limiter import QuotaExceeded
+from ti_cache import fetch_json
+
 # Load API key from .env file
 load_dotenv()
 
@@ -10,6 +13,7 @@ load_dotenv()
 VirusTotal IP Lookup Script
 ---------------------------
 Fetches and parses VirusTotal IP information and displays key details in a readable format.
+Answers are cached on disk (ti_cache.py), so repeat lookups within a day do not use quota.
 """
 
 # Get API key and IP input
@@ -27,15 +31,24 @@ headers = {
     "x-apikey": api_key
 }
 
-# Send request
-response = requests.get(url, headers=headers)
+# Send request (served from the cache when fresh)
+try:
+    data = fetch_json("virustotal", ip_addr, url, headers=headers)
+except requests.HTTPError as e:
+    print(f"API request failed with status code {e.response.status_code}")
+    print(e.response.text)
+    exit(1)
+except QuotaExceeded as e:
+    print(f"Not sent: {e}")
+    exit(1)
+except requests.RequestException as e:
+    print(f"Error fetching data for {ip_addr}: {e}")
+    exit(1)
 
-if response.status_code != 200:
-    print(f"API request failed with status code {response.status_code}")
-    print(response.text)
+if data is None:
+    print(f"VirusTotal has no data for {ip_addr}.")
     exit(1)
 
-data = response.json()
 attrs = data.get("data", {}).get("attributes", {})
 
 # Extract key fields